@@ -1,5 +1,8 @@
 from flask import Flask, request, jsonify
 from mlb_analytics import *
+from datasets import load_dataset, apply_schema, team_rows, date_rows, changes_since, select_rows, SCHEMAS
+from memo import cache_stats
+import snapshot
 import pandas as pd
 import numpy as np
 import os
@@ -7,25 +10,179 @@ import json
 import base64
 from io import BytesIO
 import requests
+import threading
+import weakref
+from dataclasses import dataclass, field, replace
 
 app = Flask(__name__,static_folder="wwwroot", static_url_path="")
 
+# Heavy analytics/scraping imports are deferred until first use; set MLB_WARMUP=1
+# (or MLB_WARMUP=all to include the scrapers) to import them at boot instead.
+if os.environ.get("MLB_WARMUP"):
+    warmup(ingestion=os.environ["MLB_WARMUP"].lower() == "all")
+
 
 def df_to_records_without_nans(df: pd.DataFrame):
     # Ensure object dtype so None survives JSON encoding
     out = df.astype(object).where(pd.notnull(df), None)
     return out.to_dict(orient="records")
 
-# Global variables to cache data
-POWER = pd.DataFrame()
-STANDINGS = pd.DataFrame()
-ODDS = pd.DataFrame()
-BATTING = pd.DataFrame()
-PITCHING = pd.DataFrame()
-FIELDING = pd.DataFrame()
-TEAMS = {}
-TMS = {}
-YEAR = 2025  # default year
+# Everything the routes serve lives in one immutable snapshot. Loads and refreshes build a new
+# DataState and swap the STATE reference in a single assignment, so a request (which reads
+# STATE once) never sees datasets from two different versions.
+@dataclass(frozen=True, eq=False)
+class DataState:
+    year: int = 2025  # default year
+    power: pd.DataFrame = field(default_factory=pd.DataFrame)
+    standings: pd.DataFrame = field(default_factory=pd.DataFrame)
+    odds: pd.DataFrame = field(default_factory=pd.DataFrame)
+    batting: pd.DataFrame = field(default_factory=pd.DataFrame)
+    pitching: pd.DataFrame = field(default_factory=pd.DataFrame)
+    fielding: pd.DataFrame = field(default_factory=pd.DataFrame)
+    teams: dict = field(default_factory=dict)
+    tms: dict = field(default_factory=dict)
+
+STATE = DataState()
+_STATE_LOCK = threading.Lock()
+
+def _update(**changes) -> DataState:
+    """Copy-on-write update of the current snapshot (e.g. one lazily loaded dataset)."""
+    global STATE
+    with _STATE_LOCK:
+        STATE = replace(STATE, **changes)
+        return STATE
+
+# HMM features derived from the power table: (fingerprint, power table, features), swapped as one
+# tuple so a reader never pairs one table's key with another table's features
+POWERX = (None, pd.DataFrame(), pd.DataFrame())
+
+def _appended_weeks(old: pd.DataFrame, power: pd.DataFrame) -> pd.DataFrame | None:
+    """The rows of `power` dated after all of `old` when the rest of it is `old` unchanged, else None."""
+    if old.empty or list(old.columns) != list(power.columns):
+        return None
+    newer = (power["date"] > old["date"].max()).to_numpy()
+    before = power.loc[~newer].reset_index(drop=True)
+    # compared as objects: a new week adds categories (e.g. its url) to the old rows' dtype
+    if not newer.any() or not before.astype(object).equals(old.reset_index(drop=True).astype(object)):
+        return None
+    return power.loc[newer]
+
+def _power_features(power: pd.DataFrame) -> pd.DataFrame:
+    global POWERX
+    key, old, features = POWERX
+    new_key = frame_fingerprint(power)
+    if new_key == key:
+        return features
+    # a weekly refresh only appends the latest week: extend the features instead of rebuilding them
+    new_rows = _appended_weeks(old, power)
+    if new_rows is None:
+        features = prepare_power_features_for_hmm(power)
+    else:
+        features = append_power_features(features, new_rows)
+    POWERX = (new_key, power, features)
+    return features
+
+DATASETS = ("power", "standings", "odds", "batting", "pitching", "fielding")
+
+# seasons loaded by the startup warm-up (MLB_PRELOAD), served without touching disk
+_PRELOADED = {}
+
+def _load(name: str, year: int):
+    state = _PRELOADED.get(year)
+    if state is not None and not getattr(state, name).empty:
+        return getattr(state, name)
+    return load_dataset(name, year)
+
+def _read_teams(year: int):
+    if os.path.isfile(f"data/teams_{year}.json") and os.path.isfile(f"data/tms_{year}.json"):
+        with open(f"data/teams_{year}.json", "r") as f:
+            teams = json.load(f)
+        with open(f"data/tms_{year}.json", "r") as f:
+            tms = json.load(f)
+        return teams, tms
+    return STATE.teams, STATE.tms
+
+def load_states(years, workers: int = 6, on_done=None) -> dict:
+    """
+    {year: DataState} for several seasons, every (season, dataset) file read in parallel
+    (Feather/CSV reads release the GIL for most of their time). on_done(name, year) is called
+    as each file finishes; a missing dataset becomes an empty frame.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    tasks = [(name, year) for year in years for name in DATASETS]
+    frames = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(load_dataset, name, year): (name, year) for name, year in tasks}
+        for fut, (name, year) in futures.items():
+            df = fut.result()
+            frames[(name, year)] = df if df is not None else pd.DataFrame()
+            if on_done is not None:
+                on_done(name, year)
+    out = {}
+    for year in years:
+        teams, tms = _read_teams(year)
+        out[year] = DataState(year=year, teams=teams, tms=tms,
+                              **{name: frames[(name, year)] for name in DATASETS})
+    return out
+
+def load_state(year: int) -> DataState:
+    """Every stored dataset of `year` (empty frame if missing) plus its teams/tms JSON."""
+    return load_states([year])[year]
+
+# precomputed analytics (snapshot.py) per served state; None when there is no matching snapshot
+_SNAPSHOTS = weakref.WeakKeyDictionary()
+
+def _snapshot_for(state: DataState):
+    if state not in _SNAPSHOTS:
+        frames = {name: getattr(state, name) for name in DATASETS}
+        version = snapshot.state_version(frames, state.teams, state.tms)
+        _SNAPSHOTS[state] = snapshot.load(state.year, version)
+    return _SNAPSHOTS[state]
+
+def warm_state(state: DataState) -> DataState:
+    # build derived data before the swap so the first request after it is not slow
+    if not state.power.empty:
+        _power_features(state.power)
+        _snapshot_for(state)
+    return state
+
+def build_snapshot(year: int) -> dict:
+    """Serve `year` and compute every snapshot query live through the routes (see snapshot.py)."""
+    state = hot_swap(year)
+    if state.power.empty or state.standings.empty:
+        raise FileNotFoundError(f"no stored power/standings data for {year}")
+    frames = {name: getattr(state, name) for name in DATASETS}
+    version = snapshot.state_version(frames, state.teams, state.tms)
+    _SNAPSHOTS[state] = None  # compute, don't replay an older snapshot
+    with app.test_client() as client:
+        res = snapshot.build(client, state.tms.values(), version, year)
+    _SNAPSHOTS.pop(state, None)
+    return res
+
+def hot_swap(year: int | None = None) -> DataState:
+    """Load and warm a new snapshot off to the side, then publish it in one assignment.
+    Memoized analytics are keyed by dataset fingerprint, so stale entries are simply never hit."""
+    global STATE
+    new = warm_state(load_state(STATE.year if year is None else year))
+    with _STATE_LOCK:
+        STATE = new
+        if new.year in _PRELOADED:
+            _PRELOADED[new.year] = new
+    return new
+
+@app.before_request
+def serve_snapshot():
+    # analytics queries are lookups while the precomputed snapshot matches the served data
+    if request.path not in snapshot.ROUTES or os.environ.get("MLB_SNAPSHOT") == "off":
+        return None
+    s = STATE
+    if s.power.empty:
+        return None
+    entries = _snapshot_for(s)
+    text = entries.get(snapshot.request_key(request.path, request.args)) if entries else None
+    if text is None:
+        return None
+    return app.response_class(text, mimetype="application/json")
 
 @app.route("/")
 def home():
@@ -68,180 +225,188 @@ def logo():
 
 @app.route("/teams")
 def teams():
-    global TEAMS, TMS
     # update teams from file
-    if not TEAMS or not TMS:
-        year = int(request.args.get("year", 2025))
+    s = STATE
+    if not s.teams or not s.tms:
+        year = _year()
         teams_path = f"data/teams_{year}.json"
         tms_path = f"data/tms_{year}.json"
         if os.path.isfile(teams_path) and os.path.isfile(tms_path):
             with open(teams_path, "r") as f:
-                TEAMS = json.load(f)
+                teams = json.load(f)
             with open(tms_path, "r") as f:
-                TMS = json.load(f)
-    teams = TEAMS
-    tms = TMS
-    return {"teams": teams, "tms": tms}
+                tms = json.load(f)
+            s = _update(teams=teams, tms=tms)
+    return {"teams": s.teams, "tms": s.tms}
+
+# ---- projection / filtering on the data endpoints: fields=a,b teams=TOR,NYY (codes or slugs)
+# from=/to=YYYY-MM-DD; without them the whole season is returned as before ----
+class QueryError(ValueError):
+    pass
+
+@app.errorhandler(QueryError)
+def query_error(e):
+    return {"error": str(e)}, 400
+
+def _year() -> int:
+    try:
+        return int(request.args.get("year", 2025))
+    except ValueError:
+        raise QueryError("year must be an integer") from None
+
+def _rows(name: str, df: pd.DataFrame) -> list:
+    args = request.args
+    fields = [f for f in args.get("fields", "").split(",") if f]
+    year = _year()
+    teams = [_team_slug(t, year) for value in args.getlist("teams") for t in value.split(",") if t]
+    start, end = args.get("from") or None, args.get("to") or None
+    if not (fields or teams or start or end):
+        return df.to_dict(orient="records")
+    try:
+        out = select_rows(name, df, teams, start, end, fields)
+    except (KeyError, ValueError) as e:
+        raise QueryError(e.args[0] if e.args else str(e)) from None
+    return out.to_dict(orient="records")
 
 @app.route("/power")
 def power():
-    global POWER, TEAMS, TMS, YEAR
-    year = int(request.args.get("year", 2025))
+    year = _year()
+    s = STATE
 
     # 1) Serve from in-memory cache if same year
-    if not POWER.empty and YEAR == year:
-        return {"power": POWER.to_dict(orient="records"), "teams": TEAMS, "tms": TMS}
+    if not s.power.empty and s.year == year:
+        return {"power": _rows("power", s.power), "teams": s.teams, "tms": s.tms}
 
     # 2) If cache is empty, prefer on-disk CSV (do NOT touch TEAMS/TMS)
-    csv_path = f"data/power_rankings_{year}.csv"
-    if os.path.isfile(csv_path):
-        df = pd.read_csv(csv_path)
-        if "date" in df.columns:
-            df["date"] = pd.to_datetime(df["date"], errors="coerce")
-        POWER = df
-        YEAR = year
+    df = _load("power", year)  # compact dtypes, parsed dates
+    if df is not None:
+        s = _update(power=df, year=year)
         # leave TEAMS and TMS exactly as they are
-        return {"power": POWER.to_dict(orient="records"), "teams": TEAMS, "tms": TMS}
+        return {"power": _rows("power", s.power), "teams": s.teams, "tms": s.tms}
 
     # 3) Fall back to the original function (this will also update TEAMS/TMS)
+    from mlb_rankings import sunday_power  # scraping stack is only imported when needed
     power_df, teams, tms = sunday_power(year)
-    POWER = power_df
-    TEAMS = teams
-    TMS = tms
-    YEAR = year
-    return {"power": POWER.to_dict(orient="records"), "teams": TEAMS, "tms": TMS}
+    s = _update(power=apply_schema("power", power_df), teams=teams, tms=tms, year=year)
+    return {"power": _rows("power", s.power), "teams": s.teams, "tms": s.tms}
 
 @app.route("/standings")
 def standings():
-    global STANDINGS, YEAR
-    year = int(request.args.get("year", 2025))
+    year = _year()
 
     # serve from warm cache
-    if not STANDINGS.empty and YEAR == year:
-        return {"standings": STANDINGS.to_dict(orient="records")}
+    s = STATE
+    if not s.standings.empty and s.year == year:
+        return {"standings": _rows("standings", s.standings)}
 
     # CSV fallback
-    csv_path = f"data/standings_{year}.csv"
-    if os.path.isfile(csv_path):
-        df = pd.read_csv(csv_path)
-        if "date" in df.columns:
-            df["date"] = pd.to_datetime(df["date"], errors="coerce")
-        STANDINGS = df
-        YEAR = year
-        return {"standings": STANDINGS.to_dict(orient="records")}
+    df = _load("standings", year)
+    if df is not None:
+        _update(standings=df, year=year)
+        return {"standings": _rows("standings", df)}
 
     # compute/fetch
+    from mlb_rankings import sunday_standings
     df = sunday_standings(year)
-    STANDINGS = df
-    YEAR = year
-    return {"standings": df.to_dict(orient="records")}
+    df = apply_schema("standings", df)
+    _update(standings=df, year=year)
+    return {"standings": _rows("standings", df)}
 
 
 @app.route("/odds")
 def odds():
-    global ODDS, YEAR
-    year = int(request.args.get("year", 2025))
+    year = _year()
 
-    if not ODDS.empty and YEAR == year:
-        return {"odds": ODDS.to_dict(orient="records")}
+    s = STATE
+    if not s.odds.empty and s.year == year:
+        return {"odds": _rows("odds", s.odds)}
 
-    csv_path = f"data/odds_{year}.csv"
-    if os.path.isfile(csv_path):
-        df = pd.read_csv(csv_path)
-        if "date" in df.columns:
-            df["date"] = pd.to_datetime(df["date"], errors="coerce")
-        ODDS = df
-        YEAR = year
-        return {"odds": ODDS.to_dict(orient="records")}
+    df = _load("odds", year)
+    if df is not None:
+        _update(odds=df, year=year)
+        return {"odds": _rows("odds", df)}
 
+    from mlb_rankings import sunday_odds
     df = sunday_odds(year)
-    ODDS = df
-    YEAR = year
-    return {"odds": df.to_dict(orient="records")}
+    df = apply_schema("odds", df)
+    _update(odds=df, year=year)
+    return {"odds": _rows("odds", df)}
 
 
 @app.route("/batting")
 def batting():
-    global BATTING, YEAR
-    year = int(request.args.get("year", 2025))
+    year = _year()
 
-    if not BATTING.empty and YEAR == year:
-        return {"batting": BATTING.to_dict(orient="records")}
+    s = STATE
+    if not s.batting.empty and s.year == year:
+        return {"batting": _rows("batting", s.batting)}
 
-    csv_path = f"data/batting_stats_{year}.csv"
-    if os.path.isfile(csv_path):
-        df = pd.read_csv(csv_path)
-        if "date" in df.columns:
-            df["date"] = pd.to_datetime(df["date"], errors="coerce")
-        BATTING = df
-        YEAR = year
-        return {"batting": BATTING.to_dict(orient="records")}
+    df = _load("batting", year)
+    if df is not None:
+        _update(batting=df, year=year)
+        return {"batting": _rows("batting", df)}
 
+    from mlb_rankings import get_batting_stats
     df = get_batting_stats(year)
-    BATTING = df
-    YEAR = year
-    return {"batting": df.to_dict(orient="records")}
+    df = apply_schema("batting", df)
+    _update(batting=df, year=year)
+    return {"batting": _rows("batting", df)}
 
 
 @app.route("/pitching")
 def pitching():
-    global PITCHING, YEAR
-    year = int(request.args.get("year", 2025))
+    year = _year()
 
-    if not PITCHING.empty and YEAR == year:
-        return {"pitching": PITCHING.to_dict(orient="records")}
+    s = STATE
+    if not s.pitching.empty and s.year == year:
+        return {"pitching": _rows("pitching", s.pitching)}
 
-    csv_path = f"data/pitching_stats_{year}.csv"
-    if os.path.isfile(csv_path):
-        df = pd.read_csv(csv_path)
-        if "date" in df.columns:
-            df["date"] = pd.to_datetime(df["date"], errors="coerce")
-        PITCHING = df
-        YEAR = year
-        return {"pitching": PITCHING.to_dict(orient="records")}
+    df = _load("pitching", year)
+    if df is not None:
+        _update(pitching=df, year=year)
+        return {"pitching": _rows("pitching", df)}
 
+    from mlb_rankings import get_pitching_stats
     df = get_pitching_stats(year)
-    PITCHING = df
-    YEAR = year
-    return {"pitching": df.to_dict(orient="records")}
+    df = apply_schema("pitching", df)
+    _update(pitching=df, year=year)
+    return {"pitching": _rows("pitching", df)}
 
 
 @app.route("/fielding")
 def fielding():
-    global FIELDING, YEAR
-    year = int(request.args.get("year", 2025))
+    year = _year()
 
-    if not FIELDING.empty and YEAR == year:
-        return {"fielding": FIELDING.to_dict(orient="records")}
+    s = STATE
+    if not s.fielding.empty and s.year == year:
+        return {"fielding": _rows("fielding", s.fielding)}
 
-    csv_path = f"data/fielding_stats_{year}.csv"
-    if os.path.isfile(csv_path):
-        df = pd.read_csv(csv_path)
-        if "date" in df.columns:
-            df["date"] = pd.to_datetime(df["date"], errors="coerce")
-        FIELDING = df
-        YEAR = year
-        return {"fielding": FIELDING.to_dict(orient="records")}
+    df = _load("fielding", year)
+    if df is not None:
+        _update(fielding=df, year=year)
+        return {"fielding": _rows("fielding", df)}
 
+    from mlb_rankings import get_fielding_stats
     df = get_fielding_stats(year)
-    FIELDING = df
-    YEAR = year
-    return {"fielding": df.to_dict(orient="records")}
+    df = apply_schema("fielding", df)
+    _update(fielding=df, year=year)
+    return {"fielding": _rows("fielding", df)}
 
 @app.route("/ranks")
 def ranks():
+    s = STATE
     selected_codes = request.args.getlist("teams")  # list of team codes
     mode = request.args.get("mode", "both")       # 'power', 'mlb', 'diff', or 'both'
 
-    if POWER.empty or STANDINGS.empty:
+    if s.power.empty or s.standings.empty:
         return {"error": "Data not loaded. Please fetch /power, /standings endpoints first."}, 400
 
     df = build_plot_table(
-        power=POWER,
-        standings=STANDINGS,
+        power=s.power,
+        standings=s.standings,
         selected_codes=selected_codes,
-        team_names=TEAMS,
-        team_codes=TMS,
+        team_names=s.teams,
+        team_codes=s.tms,
         mode=mode
     )
     return {"ranks": df_to_records_without_nans(df)}
@@ -259,20 +424,21 @@ def _series_to_native_dict(s: pd.Series) -> dict:
 
 @app.route("/kdes")
 def kdes():
+    s = STATE
     selected_codes = request.args.getlist("teams")  # e.g., ?teams=TOR&teams=NYY
     source = request.args.get("source", "power")    # 'power' or 'mlb'
 
-    if POWER.empty or STANDINGS.empty:
+    if s.power.empty or s.standings.empty:
         return jsonify({"error": "Data not loaded. Please fetch /power and /standings first."}), 400
 
     # Optional: normalize codes to uppercase and de-dup
     selected_codes = sorted({code.upper() for code in selected_codes}) if selected_codes else []
 
     kde_df, hist_df, peaks, bw = build_delta_kde_and_hist(
-        power=POWER,
-        standings=STANDINGS,
-        team_names=TEAMS,   # {team_id -> display name}
-        team_codes=TMS,     # {team_id -> TEAMCODE}
+        power=s.power,
+        standings=s.standings,
+        team_names=s.teams,   # {team_id -> display name}
+        team_codes=s.tms,     # {team_id -> TEAMCODE}
         selected_codes=selected_codes,
         source=source,
         grid=np.linspace(-15, 15, 300),
@@ -289,17 +455,18 @@ def kdes():
 
 @app.route("/volatility")
 def volatility():
+    s = STATE
     selected_codes = request.args.getlist("teams")  # list of team codes
     source = request.args.get("source", "power")    # 'power' or 'mlb'
 
-    if POWER.empty or STANDINGS.empty:
+    if s.power.empty or s.standings.empty:
         return {"error": "Data not loaded. Please fetch /power, /standings endpoints first."}, 400
 
     volatiliy_data = build_rank_volatility(
-        power=POWER,
-        standings=STANDINGS,
-        team_names=TEAMS,
-        team_codes=TMS,
+        power=s.power,
+        standings=s.standings,
+        team_names=s.teams,
+        team_codes=s.tms,
         selected_codes=selected_codes,
         source=source
     )
@@ -308,18 +475,19 @@ def volatility():
 
 @app.route("/stability")
 def stability():
+    s = STATE
     team_code = request.args.get("team")            # single team code
     source = request.args.get("source", "power")    # 'power' or 'mlb'
     max_lag = int(request.args.get("max_lag", 4))   # max lag for ACF
 
-    if POWER.empty or STANDINGS.empty:
+    if s.power.empty or s.standings.empty:
         return {"error": "Data not loaded. Please fetch /power, /standings endpoints first."}, 400
 
     stab_df = build_acf_stability_timeseries(
-        power=POWER,
-        standings=STANDINGS,
-        team_names=TEAMS,
-        team_codes=TMS,
+        power=s.power,
+        standings=s.standings,
+        team_names=s.teams,
+        team_codes=s.tms,
         team_code=team_code,
         source=source,
         max_lag=max_lag,
@@ -330,18 +498,19 @@ def stability():
     }
 @app.route("/consistency")
 def consistency():
+    s = STATE
     team_code = request.args.get("team")            # single team code
     source = request.args.get("source", "power")    # 'power' or 'mlb'
     max_lag = int(request.args.get("max_lag", 4))   # max lag for ACF
 
-    if POWER.empty or STANDINGS.empty:
+    if s.power.empty or s.standings.empty:
         return {"error": "Data not loaded. Please fetch /power, /standings endpoints first."}, 400
 
     _ , cons_df = build_acf_stability_timeseries(
-        power=POWER,
-        standings=STANDINGS,
-        team_names=TEAMS,
-        team_codes=TMS,
+        power=s.power,
+        standings=s.standings,
+        team_names=s.teams,
+        team_codes=s.tms,
         team_code=team_code,
         source=source,
         max_lag=max_lag,
@@ -354,17 +523,18 @@ def consistency():
 
 @app.route("/granger")
 def granger():
+    s = STATE
     team_code = request.args.get("team")            # single team code
     max_lag = int(request.args.get("maxlag", 4))   # max lag for Granger test
 
-    if POWER.empty or STANDINGS.empty:
+    if s.power.empty or s.standings.empty:
         return {"error": "Data not loaded. Please fetch /power, /standings endpoints first."}, 400
 
     granger_df, stats = granger_power_to_mlb_report(
-        power=POWER,
-        standings=STANDINGS,
-        team_names=TEAMS,
-        team_codes=TMS,
+        power=s.power,
+        standings=s.standings,
+        team_names=s.teams,
+        team_codes=s.tms,
         team_code=team_code,
         max_lag=max_lag
     )
@@ -376,18 +546,19 @@ def granger():
 
 @app.route("/similarity")
 def similarity():
+    s = STATE
     team_code_a = request.args.get("team_a")        # single team code A
     team_code_b = request.args.get("team_b")        # single team code B
     source = request.args.get("source", "power")    # 'power' or 'mlb'
 
-    if POWER.empty or STANDINGS.empty:
+    if s.power.empty or s.standings.empty:
         return {"error": "Data not loaded. Please fetch /power, /standings endpoints first."}, 400
 
     stats = compute_trajectory_similarity(
-        power=POWER,
-        standings=STANDINGS,
-        team_names=TEAMS,
-        team_codes=TMS,
+        power=s.power,
+        standings=s.standings,
+        team_names=s.teams,
+        team_codes=s.tms,
         team_code_a=team_code_a,
         team_code_b=team_code_b,
         source=source
@@ -399,17 +570,18 @@ def similarity():
 
 @app.route("/clusters")
 def clusters():
+    s = STATE
     k = int(request.args.get("k", 6))               # number of clusters
 
-    if STANDINGS.empty or ODDS.empty or BATTING.empty or PITCHING.empty or FIELDING.empty:
+    if s.standings.empty or s.odds.empty or s.batting.empty or s.pitching.empty or s.fielding.empty:
         return {"error": "Data not loaded. Please fetch /standings, /odds, /batting, /pitching, /fielding endpoints first."}, 400
 
     clusters = cluster_and_summarize_season_stats(
-        standings=STANDINGS,
-        odds=ODDS,
-        batting=BATTING,
-        pitching=PITCHING,
-        fielding=FIELDING,
+        standings=s.standings,
+        odds=s.odds,
+        batting=s.batting,
+        pitching=s.pitching,
+        fielding=s.fielding,
         k=k
     )
     clusters = clusters.assign(teams=clusters["teams"].astype(str).str.split(r"\s*,\s*"))
@@ -417,20 +589,101 @@ def clusters():
         "clusters": clusters.to_dict(orient="records")
     }
 
+@app.route("/cache_stats")
+def cache_stats_route():
+    # hit rates / sizes of the memoized analytics functions
+    return {"cache": cache_stats()}
+
+@app.route("/ready")
+def ready():
+    # readiness probe: 503 while the startup warm-up runs (or failed), 200 once warm / when lazy
+    ok = READY["status"] in ("ready", "lazy")
+    return {"ready": ok, **READY}, 200 if ok else 503
+
+# ---- narrow lookups (indexed SQLite when MLB_SQLITE=1, else a filter over the dataset) ----
+def _lookup_args():
+    dataset = request.args.get("dataset", "standings")
+    if dataset not in SCHEMAS:
+        return None, None, ({"error": f"unknown dataset {dataset!r}"}, 400)
+    return dataset, _year(), None
+
+def _team_slug(team: str, year: int) -> str:
+    # accept the 3-letter code (TOR) as well as the slug (toronto-bluejays); the code table comes
+    # from the served state or data/tms_{year}.json, so it works before /teams or /power ran
+    s = STATE
+    tms = s.tms if s.year == year and s.tms else _read_teams(year)[1]
+    if team in tms:
+        return team
+    slug = {code.upper(): slug for slug, code in tms.items()}.get(team.upper())
+    if slug is None:
+        raise QueryError(f"unknown team {team!r} for {year}")
+    return slug
+
+@app.route("/team_last")
+def team_last():
+    # latest row of one team, e.g. /team_last?dataset=standings&team=toronto-bluejays
+    team = request.args.get("team")
+    if not team:
+        return {"error": "team param required"}, 400
+    dataset, year, err = _lookup_args()
+    if err:
+        return err
+    rows = team_rows(dataset, year, _team_slug(team, year), last=True)
+    return {"row": rows[0] if rows else None}
+
+@app.route("/team_series")
+def team_series():
+    # all rows of one team in a season, oldest first
+    team = request.args.get("team")
+    if not team:
+        return {"error": "team param required"}, 400
+    dataset, year, err = _lookup_args()
+    if err:
+        return err
+    return {"rows": team_rows(dataset, year, _team_slug(team, year))}
+
+@app.route("/date_rows")
+def date_rows_route():
+    # every team's row on one date, e.g. /date_rows?dataset=power&date=2025-06-15
+    date = request.args.get("date")
+    if not date:
+        return {"error": "date param required"}, 400
+    dataset, year, err = _lookup_args()
+    if err:
+        return err
+    if "date" not in SCHEMAS[dataset]["dates"]:
+        return {"error": f"{dataset} has no date column"}, 400
+    try:
+        day = pd.Timestamp(date)
+    except ValueError:
+        return {"error": f"invalid date {date!r}, expected YYYY-MM-DD"}, 400
+    return {"rows": date_rows(dataset, year, day.strftime("%Y-%m-%d"))}
+
+@app.route("/changes")
+def changes():
+    # rows added/modified after a client's version, e.g. /changes?since=41 (since=0: everything);
+    # the response's "version" is what to send next time
+    try:
+        since = int(request.args.get("since", 0))
+    except ValueError:
+        return {"error": "since must be an integer version"}, 400
+    return changes_since(since, _year())
+
 @app.route("/hmm")
 def hmm():
+    s = STATE
     team = request.args.get("team")  # e.g., TOR
     if not team:
         return {"error": "team param required"}, 400
 
-    # build features once (or reuse your cache)
-    powerx = prepare_power_features_for_hmm(POWER)
+    # features are built once per s.power load
+    powerx = _power_features(s.power)
 
     states_df, stats = fit_team_hmm(
-        power=POWER,
+        power=s.power,
         team_code=team,
-        team_names=TEAMS,
-        team_codes=TMS,
+        team_names=s.teams,
+        team_codes=s.tms,
         power_features=powerx,
         min_points=8
     )
@@ -450,6 +703,100 @@ def hmm():
     }
     return out
 
+# ---- startup warm-up (MLB_PRELOAD=2025 or 2025,2024; the first season is served) ----
+# Landing-page requests replayed after loading with MLB_PRELOAD_ANALYTICS=1, so their memoized
+# analytics are computed before the worker reports ready.
+WARM_REQUESTS = (
+    "/ranks?teams=TOR&mode=both",
+    "/kdes?teams=TOR&source=power",
+    "/volatility?teams=TOR&source=power",
+    "/stability?team=TOR&source=power",
+    "/granger?team=TOR",
+    "/clusters",
+    "/hmm?team=TOR",
+)
+
+READY = {"status": "lazy", "loaded": 0, "total": 0, "seconds": None, "errors": []}
+
+def preload(years, workers: int = 6, analytics: bool = False) -> None:
+    """Load every dataset of `years` in parallel, serve the first season, warm derived data."""
+    global STATE
+    import time
+    t0 = time.perf_counter()
+    READY.update(status="loading", loaded=0, total=len(years) * len(DATASETS), errors=[])
+
+    def done(name, year):
+        READY["loaded"] += 1
+
+    try:
+        states = load_states(years, workers=workers, on_done=done)
+        READY["status"] = "warming"
+        for state in states.values():
+            warm_state(state)
+        with _STATE_LOCK:
+            _PRELOADED.update(states)
+            STATE = states[years[0]]
+        missing = [y for y, st in states.items() if st.power.empty and st.standings.empty]
+        READY["errors"] += [f"no stored data for {y}" for y in missing]
+        if analytics and years[0] not in missing:
+            with app.test_client() as client:
+                for url in WARM_REQUESTS:
+                    resp = client.get(url)
+                    if resp.status_code != 200:
+                        READY["errors"].append(f"{url}: HTTP {resp.status_code}")
+        READY["status"] = "ready"
+    except Exception as e:
+        READY["errors"].append(f"{type(e).__name__}: {e}")
+        READY["status"] = "failed"
+    READY["seconds"] = round(time.perf_counter() - t0, 2)
+
+def _preload_years() -> list:
+    value = os.environ.get("MLB_PRELOAD", "")
+    if not value:
+        return []
+    return [2025] if value == "1" else [int(y) for y in value.split(",")]
+
+def preload_shared() -> None:
+    """
+    Warm-up for a forking server's master (gunicorn.conf.py, preload_app): import the analytics
+    stack and load the datasets once, synchronously, then freeze them out of the GC so the
+    forked workers share those pages copy-on-write instead of each building its own copy.
+    """
+    import gc
+    warmup()
+    preload(_preload_years() or [2025], workers=int(os.environ.get("MLB_PRELOAD_WORKERS", 6)),
+            analytics=bool(os.environ.get("MLB_PRELOAD_ANALYTICS")))
+    gc.freeze()  # the collector would otherwise touch (and un-share) every object header
+
+WATCHER = None
+
+def start_background() -> None:
+    """Start the warm-up and refresh threads configured by the environment (once per serving process)."""
+    global WATCHER
+    years = _preload_years()
+    if years and READY["status"] == "lazy":  # already warm when forked from a preloaded master
+        threading.Thread(target=preload, name="preload", daemon=True,
+                         args=(years, int(os.environ.get("MLB_PRELOAD_WORKERS", 6)),
+                               bool(os.environ.get("MLB_PRELOAD_ANALYTICS")))).start()
+
+    # weekly refresh: reload when the files on disk change (MLB_RELOAD_POLL=seconds) and/or run
+    # the refresh itself in one of the workers (MLB_REFRESH=1); see refresh.py
+    if float(os.environ.get("MLB_RELOAD_POLL", 0) or 0) > 0 or os.environ.get("MLB_REFRESH"):
+        from refresh import DatasetWatcher, RefreshScheduler
+        # the season to keep fresh is fixed: the served MLB_PRELOAD season, else the current one
+        # (STATE.year follows whatever ?year= the last request asked for)
+        season = years[0] if years else None
+        WATCHER = DatasetWatcher(season, hot_swap,
+                                 poll=float(os.environ.get("MLB_RELOAD_POLL", 0) or 60))
+        WATCHER.check()  # remember the version on disk now
+        WATCHER.start()
+        if os.environ.get("MLB_REFRESH"):
+            RefreshScheduler(season, on_refreshed=lambda year: WATCHER.check()).start()
+
+# threads don't survive fork: under gunicorn.conf.py they are started per worker in post_fork
+if not os.environ.get("MLB_SHARED_PRELOAD"):
+    start_background()
+
 if __name__ == "__main__":
     import os
     app.run(host="0.0.0.0", port=int(os.environ.get("PORT", 5000)))
\ No newline at end of file
@@ -0,0 +1,158 @@
+# backfill.py
+# Build the data/ history for a range of seasons in one go:
+#
+#   python backfill.py 2006 2025 --workers 4 --browsers 8
+#
+# Seasons run in parallel on a process pool (one season per worker). Each season writes its
+# datasets atomically, so an interrupted run never leaves a half-written file, and seasons
+# that already cover every week and team are skipped on the next run (otherwise only the
+# missing weeks are fetched). Per-season / per-source timings are printed as seasons finish,
+# plus a summary table at the end.
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import pandas as pd
+
+from datasets import DATA_DIR, dataset_path, stored_dates, write_dataset
+
+SOURCES = ("power", "standings", "odds", "stats")
+STATS_DATASETS = ("batting", "pitching", "fielding")
+TEAM_COUNT = 30  # teams in the league, when the season's team list is not stored
+
+
+def season_over(year: int) -> bool:
+    return datetime.now() >= datetime(year, 11, 1)
+
+
+def _covers_teams(name: str, year: int, data_dir: str) -> bool:
+    path = dataset_path(name, year, data_dir)
+    if not os.path.isfile(path):
+        return False
+    have = set(pd.read_csv(path, usecols=["team_name"])["team_name"].dropna())
+    teams_file = os.path.join(data_dir, f"teams_{year}.json")
+    if os.path.isfile(teams_file):
+        with open(teams_file) as f:
+            return set(json.load(f)) <= have
+    return len(have) >= TEAM_COUNT
+
+
+def source_complete(source: str, year: int, data_dir: str = DATA_DIR) -> bool:
+    """
+    A finished season whose `source` covers it needs no backfill: rows for every team (stats)
+    or for every week of the season (weekly sources; see mlb_rankings.missing_sundays). Missing weeks or teams
+    (a failed fetch) make it incomplete, so the next run scrapes them again.
+    """
+    if not season_over(year):
+        return False
+    if source == "stats":
+        return all(_covers_teams(n, year, data_dir) for n in STATS_DATASETS)
+    from mlb_rankings import missing_sundays
+    return bool(stored_dates(source, year, data_dir)) and not missing_sundays(source, year, data_dir)
+
+
+def _write_json(obj, path: str) -> None:
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(obj, f)
+    os.replace(tmp, path)
+
+
+def backfill_season(year: int, sources=SOURCES, data_dir: str = DATA_DIR, force: bool = False,
+                    browsers: int = 2) -> dict:
+    """
+    Scrape and store every missing source of one season (runs inside a pool worker).
+    Returns {"year", "seconds": {source: s}, "skipped": [...], "errors": {source: msg}}.
+    The live season's weekly datasets are refreshed incrementally instead of rebuilt.
+    """
+    import table_rankings
+    from mlb_rankings import get_season_team_stats, refresh_weekly, sunday_power
+    from power_rankings import BROWSERS
+
+    # every browser of this process (article search and scraping, team list, bbref fallback)
+    # comes from one pool, so the season stays within its share of --browsers
+    BROWSERS.resize(browsers)
+    out = {"year": year, "seconds": {}, "skipped": [], "errors": {}}
+    # standings/odds resolve team names against the mlb.com team list
+    table_rankings.get_teams_and_tms()
+    for source in sources:
+        if not force and source_complete(source, year, data_dir):
+            out["skipped"].append(source)
+            continue
+        t0 = time.perf_counter()
+        try:
+            teams_file = os.path.join(data_dir, f"teams_{year}.json")
+            if source == "power" and (force or not os.path.isfile(teams_file)):
+                df, teams, tms = sunday_power(year, workers=browsers)
+                write_dataset("power", year, df, data_dir)
+                _write_json(teams, teams_file)
+                _write_json(tms, os.path.join(data_dir, f"tms_{year}.json"))
+            elif source == "stats":
+                for name, df in get_season_team_stats(year).items():
+                    write_dataset(name, year, df, data_dir)
+            else:
+                refresh_weekly(source, year, data_dir, full=force)  # fetches the missing weeks
+        except Exception as e:  # one broken source must not sink the other seasons
+            out["errors"][source] = f"{type(e).__name__}: {e}"
+        out["seconds"][source] = round(time.perf_counter() - t0, 1)
+    return out
+
+
+def backfill(first: int, last: int, sources=SOURCES, workers: int = 4, browsers: int = 8,
+             data_dir: str = DATA_DIR, force: bool = False) -> pd.DataFrame:
+    """
+    Backfill seasons first..last on `workers` processes. `browsers` is the total headless
+    Chrome budget, split evenly across the worker processes (power_rankings.BROWSERS).
+    Returns one row per season with per-source seconds.
+    """
+    years = list(range(first, last + 1))
+    workers = max(1, min(workers, len(years)))
+    per_season = max(1, browsers // workers)
+    rows = []
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(backfill_season, y, tuple(sources), data_dir, force, per_season): y for y in years}
+        for fut in as_completed(futures):
+            year = futures[fut]
+            try:
+                res = fut.result()
+            except Exception as e:
+                res = {"year": year, "seconds": {}, "skipped": [], "errors": {"season": f"{type(e).__name__}: {e}"}}
+            took = ", ".join(f"{s} {sec}s" for s, sec in res["seconds"].items()) or "nothing to do"
+            skipped = f" | skipped: {', '.join(res['skipped'])}" if res["skipped"] else ""
+            errors = f" | FAILED: {res['errors']}" if res["errors"] else ""
+            print(f"[{year}] {took}{skipped}{errors}", flush=True)
+            rows.append({"year": year, **res["seconds"],
+                         "total": round(sum(res["seconds"].values()), 1),
+                         "errors": len(res["errors"])})
+    print(f"backfilled {len(years)} season(s) in {time.perf_counter() - t0:.1f}s")
+    columns = ["year", *sources, "total", "errors"]
+    return pd.DataFrame(rows, columns=columns).sort_values("year").reset_index(drop=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backfill MLB datasets for a range of seasons.")
+    parser.add_argument("first", type=int, help="first season, e.g. 2006")
+    parser.add_argument("last", type=int, nargs="?", help="last season (default: first)")
+    parser.add_argument("--sources", default=",".join(SOURCES),
+                        help=f"comma-separated subset of {','.join(SOURCES)}")
+    parser.add_argument("--workers", type=int, default=4, help="seasons scraped in parallel")
+    parser.add_argument("--browsers", type=int, default=8, help="total headless browsers across workers")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--force", action="store_true", help="rebuild seasons that are already complete")
+    args = parser.parse_args(argv)
+
+    sources = [s.strip() for s in args.sources.split(",") if s.strip()]
+    unknown = set(sources) - set(SOURCES)
+    if unknown:
+        parser.error(f"unknown source(s): {', '.join(sorted(unknown))}")
+    summary = backfill(args.first, args.last or args.first, sources, args.workers, args.browsers,
+                       args.data_dir, args.force)
+    print(summary.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+# changelog.py
+# Monotonically increasing version ids for the stored datasets. Every write of a dataset
+# (datasets.write_dataset) appends one line to data/versions.jsonl naming the rows it added or
+# modified by key, plus the keys it removed; the line's version is the previous maximum + 1,
+# across all datasets and seasons. Data written before the log existed is version 0.
+# datasets.changes_since(version) turns the lines after a client's version into just those rows.
+import json
+import os
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+LOG_FILE = "versions.jsonl"  # under the data directory
+
+
+@contextmanager
+def _locked(data_dir: str):
+    """Exclusive lock for appending a version (backfill writes seasons from several processes)."""
+    os.makedirs(data_dir, exist_ok=True)
+    with open(os.path.join(data_dir, f"{LOG_FILE}.lock"), "w") as f:
+        try:
+            import fcntl
+        except ImportError:  # Windows: single writer assumed
+            yield
+            return
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def read_log(data_dir: str) -> list:
+    path = os.path.join(data_dir, LOG_FILE)
+    if not os.path.isfile(path):
+        return []
+    entries = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:  # torn last line
+                continue
+    return entries
+
+
+def current_version(data_dir: str) -> int:
+    log = read_log(data_dir)
+    return log[-1]["version"] if log else 0
+
+
+def key_strings(df: pd.DataFrame, keys: list) -> list:
+    """Row keys as stable strings ('2025-06-15|toronto-bluejays') for raw and typed frames alike."""
+    parts = []
+    for col in keys:
+        values = df[col]
+        if col == "date":
+            parts.append(pd.to_datetime(values, errors="coerce").dt.strftime("%Y-%m-%d"))
+        else:
+            parts.append(values.astype(str))
+    out = parts[0]
+    for p in parts[1:]:
+        out = out + "|" + p
+    return out.tolist()
+
+
+def diff_rows(old: pd.DataFrame | None, new: pd.DataFrame, keys: list) -> tuple:
+    """
+    (changed keys, removed keys) between the stored and the new rows of a dataset, both as
+    parsed from CSV; changed is None when everything changed (no previous file, other columns).
+    Floats compare with a relative tolerance: a CSV round trip moves the last digit.
+    """
+    if old is None or list(old.columns) != list(new.columns):
+        return None, []
+    old = old.set_axis(key_strings(old, keys))
+    old = old[~old.index.duplicated(keep="last")]
+    new = new.set_axis(key_strings(new, keys))
+    known = new.index.isin(old.index)
+    a = new[known]
+    b = old.reindex(a.index)
+    differs = np.zeros(len(a), dtype=bool)
+    for col in new.columns:
+        if pd.api.types.is_numeric_dtype(a[col]) and pd.api.types.is_numeric_dtype(b[col]):
+            same = np.isclose(a[col].to_numpy(float), b[col].to_numpy(float), rtol=1e-9, atol=0, equal_nan=True)
+        else:
+            same = (a[col].astype(str) == b[col].astype(str)).to_numpy()
+        differs |= ~same
+    changed = list(new.index[~known]) + list(a.index[differs])
+    removed = sorted(set(old.index) - set(new.index))
+    return changed, removed
+
+
+def record(name: str, year: int, changed: list | None, removed: list, data_dir: str) -> int | None:
+    """Append a version for a write of `name`/`year`; nothing (None) if no row changed."""
+    if changed is not None and not changed and not removed:
+        return None
+    with _locked(data_dir):
+        version = current_version(data_dir) + 1
+        line = json.dumps({"version": version, "dataset": name, "year": int(year),
+                           "changed": changed, "removed": removed,
+                           "at": pd.Timestamp.now(tz="UTC").isoformat(timespec="seconds")})
+        with open(os.path.join(data_dir, LOG_FILE), "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+    return version
+
+
+def changed_since(since: int, data_dir: str) -> tuple:
+    """
+    (latest version, {(dataset, year): {"changed": set | None, "removed": set}}) for the
+    versions after `since`; "changed" None means the whole dataset.
+    """
+    log = read_log(data_dir)
+    out = {}
+    for entry in log:
+        if entry["version"] <= since:
+            continue
+        slot = out.setdefault((entry["dataset"], entry["year"]), {"changed": set(), "removed": set()})
+        if entry["changed"] is None or slot["changed"] is None:
+            slot["changed"] = None
+        else:
+            slot["changed"].update(entry["changed"])
+            slot["changed"].difference_update(entry["removed"])
+        slot["removed"].update(entry["removed"])
+        if slot["changed"] is not None:
+            slot["removed"].difference_update(entry["changed"])
+    return (log[-1]["version"] if log else 0), out
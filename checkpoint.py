@@ -0,0 +1,52 @@
+# checkpoint.py
+# Append-only checkpoints for long scrapes. Every finished unit of work (one article, one
+# week of odds) is written to data/checkpoints/<name>.jsonl as soon as it completes; a rerun
+# after a crash loads those units and only scrapes the rest. The file is removed once the
+# scrape has produced its DataFrame.
+import json
+import os
+import threading
+
+CHECKPOINT_DIR = os.path.join("data", "checkpoints")
+
+
+class Checkpoint:
+    """
+    {key: value} of completed units, persisted one JSON line per record() call.
+    A torn last line (crash mid-write) is ignored on load.
+    """
+
+    def __init__(self, name: str, checkpoint_dir: str | None = None):
+        self.path = os.path.join(checkpoint_dir or CHECKPOINT_DIR, f"{name}.jsonl")
+        self._lock = threading.Lock()
+        self.done = {}
+        if os.path.isfile(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    self.done[entry["key"]] = entry["value"]
+
+    def __contains__(self, key) -> bool:
+        return key in self.done
+
+    def get(self, key, default=None):
+        return self.done.get(key, default)
+
+    def record(self, key, value) -> None:
+        line = json.dumps({"key": key, "value": value}) + "\n"
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            self.done[key] = value
+
+    def clear(self) -> None:
+        with self._lock:
+            if os.path.isfile(self.path):
+                os.remove(self.path)
+            self.done = {}
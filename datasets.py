@@ -0,0 +1,488 @@
+# datasets.py
+# Schema layer for the on-disk datasets: every CSV in data/ is loaded with explicit compact
+# dtypes (categorical team/url strings, nullable small ints for ranks, parsed dates) instead
+# of pandas' defaults. The analytics in mlb_analytics.py work on either form.
+# With pyarrow installed, each CSV is migrated on first load to a typed columnar partition
+# (storage.py) and later loads read that instead of parsing the CSV again.
+import os
+import threading
+import time
+import weakref
+import numpy as np
+import pandas as pd
+
+import changelog
+import sqlite_store
+import storage
+
+DATA_DIR = "data"
+
+# name -> file pattern + explicit dtypes. Columns not listed keep pandas' inference;
+# 'keys'/'order' (weekly datasets only) drive incremental appends.
+# 'downcast_ints' shrinks any remaining int64 column to the smallest numpy int that fits.
+SCHEMAS = {
+    "power": {
+        "file": "power_rankings_{year}.csv",
+        "keys": ["date", "team_id"],   # one row per key; incremental appends dedupe on it
+        "order": ["date", "rank"],
+        "dates": ["date"],
+        "dtypes": {
+            "url": "category",
+            "team_id": "category",
+            "team": "category",
+            "rank": "Int8",
+        },
+    },
+    "standings": {
+        "file": "standings_{year}.csv",
+        "keys": ["date", "team_id"],
+        "order": ["team_id", "date"],
+        "dates": ["date"],
+        "dtypes": {
+            "league_id": "Int16",
+            "team_id": "Int16",
+            "team_name": "category",
+            "wins": "Int16",
+            "losses": "Int16",
+            "winning_pct": "float64",   # shown to users, keep full precision
+            "division_rank": "Int8",
+            "league_rank": "Int8",
+            "sport_rank": "Int8",
+            "games_back": "category",   # '-', '1.5', ... kept as strings
+            "wc_rank": "category",
+            "wc_gb": "category",
+            "wc_elim_num": "category",
+            "elim_num": "category",
+            "mlb_rank": "Int8",
+        },
+    },
+    "odds": {
+        "file": "odds_{year}.csv",
+        "keys": ["date", "team_name"],
+        "order": ["team_name", "date"],
+        "dates": ["date"],
+        "dtypes": {
+            "team_name": "category",
+            # float64: the stored values do not survive a float32 round trip
+            "expected_wins": "float64",
+            "expected_losses": "float64",
+            "ros_wins": "float64",
+            "wc_win_odds": "float64",
+            "ds_win_odds": "float64",
+            "cs_win_odds": "float64",
+            "ws_win_odds": "float64",
+            "make_playoffs_odds": "float64",
+            "clinch_wc_odds": "float64",
+            "clinch_bye_odds": "float64",
+            "win_division_odds": "float64",
+        },
+    },
+    "batting": {
+        "file": "batting_stats_{year}.csv",
+        "keys": ["team_name"],  # season totals: one row per team
+        "dates": [],
+        "dtypes": {"team_name": "category"},
+        "downcast_ints": True,
+    },
+    "pitching": {
+        "file": "pitching_stats_{year}.csv",
+        "keys": ["team_name"],  # season totals: one row per team
+        "dates": [],
+        "dtypes": {"team_name": "category"},
+        "downcast_ints": True,
+    },
+    "fielding": {
+        "file": "fielding_stats_{year}.csv",
+        "keys": ["team_name"],  # season totals: one row per team
+        "dates": [],
+        "dtypes": {"team_name": "category"},
+        "downcast_ints": True,
+    },
+}
+
+
+def dataset_path(name: str, year: int, data_dir: str = DATA_DIR) -> str:
+    return os.path.join(data_dir, SCHEMAS[name]["file"].format(year=year))
+
+
+def apply_schema(name: str, df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cast a freshly built or loaded frame to the compact schema for `name`.
+    Unknown columns are left alone, so scraper output with extra fields still works.
+    """
+    schema = SCHEMAS[name]
+    df = df.copy()
+    for col in schema["dates"]:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors="coerce")
+    for col, dtype in schema["dtypes"].items():
+        if col not in df.columns:
+            continue
+        if dtype == "category":
+            df[col] = df[col].astype(str).where(df[col].notna()).astype("category")
+        elif dtype.startswith("Int"):
+            df[col] = pd.to_numeric(df[col], errors="coerce").round().astype(dtype)
+        else:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype(dtype)
+    if schema.get("downcast_ints"):
+        for col in df.select_dtypes(include=["int64"]).columns:
+            df[col] = pd.to_numeric(df[col], downcast="integer")
+    return df
+
+
+def _read_csv(name: str, path: str) -> pd.DataFrame:
+    schema = SCHEMAS[name]
+    # read the string columns straight into categoricals; numeric casts happen in apply_schema
+    read_dtypes = {c: "category" for c, t in schema["dtypes"].items() if t == "category"}
+    df = pd.read_csv(path, dtype=read_dtypes)
+    return apply_schema(name, df)
+
+
+def _matches_schema(name: str, df: pd.DataFrame) -> bool:
+    dtypes = SCHEMAS[name]["dtypes"]
+    return all(str(df[col].dtype) == dtype for col, dtype in dtypes.items() if col in df.columns)
+
+
+def _write_columnar(name: str, year: int, df: pd.DataFrame, data_dir: str) -> None:
+    try:
+        storage.write_frame(df, storage.partition_path(name, year, data_dir))
+    except OSError:
+        pass  # read-only data dir: keep serving from CSV
+
+
+def load_dataset(name: str, year: int, data_dir: str = DATA_DIR, columnar: bool | None = None) -> pd.DataFrame | None:
+    """
+    Dataset `name` for `year` with compact dtypes; None if it doesn't exist.
+    Reads the columnar partition when it is at least as new as the CSV and has the current
+    dtypes; otherwise parses the CSV and (re)writes the partition. columnar=False forces the CSV path (None: if pyarrow
+    is installed).
+    """
+    if columnar is None:
+        columnar = storage.available()
+    path = dataset_path(name, year, data_dir)
+    if columnar:
+        part = storage.partition_path(name, year, data_dir)
+        if storage.is_fresh(part, path):
+            df = storage.read_frame(part)
+            if _matches_schema(name, df):
+                return df
+            # written under an older schema: rebuild it from the CSV below
+    if not os.path.isfile(path):
+        if columnar:
+            storage.remove(part)  # the CSV was deleted: its partition is stale, not a copy
+        return None
+    df = _read_csv(name, path)
+    if columnar:
+        _write_columnar(name, year, df, data_dir)
+    return df
+
+
+def load_seasons(name: str, years, data_dir: str = DATA_DIR, columnar: bool | None = None) -> pd.DataFrame:
+    """Several seasons of one dataset stacked, with a `season` column; missing years are skipped."""
+    frames = []
+    for year in years:
+        df = load_dataset(name, year, data_dir, columnar)
+        if df is not None:
+            frames.append(df.assign(season=np.int16(year)))
+    if not frames:
+        return pd.DataFrame()
+    # categories differ per season; give every frame the union so concat keeps the categoricals
+    for col in frames[0].select_dtypes(include="category").columns:
+        cats = pd.api.types.union_categoricals([f[col] for f in frames if col in f.columns]).categories
+        for f in frames:
+            if col in f.columns:
+                f[col] = f[col].cat.set_categories(cats)
+    return pd.concat(frames, ignore_index=True)
+
+
+def migrate(data_dir: str = DATA_DIR) -> list:
+    """Build the columnar partition for every dataset CSV in `data_dir`; returns [(name, year)]."""
+    done = []
+    if not storage.available():
+        return done
+    for name, schema in SCHEMAS.items():
+        prefix, suffix = schema["file"].split("{year}")
+        for fname in sorted(os.listdir(data_dir)):
+            year = fname[len(prefix):-len(suffix)] if fname.startswith(prefix) and fname.endswith(suffix) else ""
+            if year.isdigit():
+                _write_columnar(name, int(year), _read_csv(name, os.path.join(data_dir, fname)), data_dir)
+                done.append((name, int(year)))
+    return done
+
+
+def stored_dates(name: str, year: int, data_dir: str = DATA_DIR) -> set:
+    """Distinct dates (midnight Timestamps) in the stored weekly dataset; empty if there is no file."""
+    path = dataset_path(name, year, data_dir)
+    if not os.path.isfile(path):
+        return set()
+    dates = pd.to_datetime(pd.read_csv(path, usecols=["date"])["date"], errors="coerce")
+    return set(dates.dropna().dt.normalize())
+
+
+def append_rows(name: str, year: int, new: pd.DataFrame, data_dir: str = DATA_DIR) -> pd.DataFrame:
+    """
+    Append freshly scraped weekly rows to the stored CSV, keeping the newest row per key,
+    and return the combined frame with the compact schema. Stored rows are merged as read
+    (default dtypes), so the CSV keeps its full text precision.
+    """
+    schema = SCHEMAS[name]
+    path = dataset_path(name, year, data_dir)
+    if new is None or new.empty:
+        stored = load_dataset(name, year, data_dir)
+        return stored if stored is not None else pd.DataFrame()
+    parts = [pd.read_csv(path)] if os.path.isfile(path) else []
+    parts.append(new)
+    df = pd.concat(parts, ignore_index=True)
+    df["date"] = pd.to_datetime(df["date"]).dt.normalize()
+    df = (df.drop_duplicates(subset=schema["keys"], keep="last")
+            .sort_values(schema["order"])
+            .reset_index(drop=True))
+    return write_dataset(name, year, df, data_dir)
+
+
+def write_dataset(name: str, year: int, df: pd.DataFrame, data_dir: str = DATA_DIR) -> pd.DataFrame:
+    """
+    Atomically replace data/<file>_{year}.csv with `df` (written to a temp file, then renamed,
+    so readers never see a partial season) and refresh its columnar partition.
+    Returns the frame with the compact schema.
+    """
+    path = dataset_path(name, year, data_dir)
+    os.makedirs(data_dir, exist_ok=True)
+    old = pd.read_csv(path) if os.path.isfile(path) else None
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    df.to_csv(tmp, index=False)
+    changed, removed = changelog.diff_rows(old, pd.read_csv(tmp), SCHEMAS[name]["keys"])
+    os.replace(tmp, path)
+    changelog.record(name, year, changed, removed, data_dir)
+    df = apply_schema(name, df)
+    if storage.available():
+        _write_columnar(name, year, df, data_dir)
+    return df
+
+
+def _records(df: pd.DataFrame) -> list:
+    """JSON-ready rows: ISO dates, None for missing values."""
+    df = df.copy()
+    for col in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = df[col].dt.strftime("%Y-%m-%d")
+    return df.astype(object).where(df.notna(), None).to_dict(orient="records")
+
+
+def _sqlite_ready(name: str, year: int, data_dir: str) -> bool:
+    """Make sure the SQLite table holds the current `year` rows of `name` (re-sync if the CSV changed)."""
+    path = dataset_path(name, year, data_dir)
+    if not os.path.isfile(path):
+        return False
+    mtime = os.path.getmtime(path)
+    if sqlite_store.synced_mtime(name, year, data_dir) != mtime:
+        sqlite_store.sync(name, year, load_dataset(name, year, data_dir), mtime, data_dir)
+    return True
+
+
+def team_rows(name: str, year: int, team: str, last: bool = False, data_dir: str = DATA_DIR) -> list:
+    """
+    Rows of one team (team slug, e.g. 'toronto-bluejays') in a season, oldest first; only the
+    latest with last=True. Indexed SQLite lookup when MLB_SQLITE is on, else a frame filter.
+    """
+    if sqlite_store.enabled() and _sqlite_ready(name, year, data_dir):
+        rows = sqlite_store.team_rows(name, year, team, data_dir, last=last)
+        return [{k: v for k, v in r.items() if k != "year"} for r in rows]
+    df = load_dataset(name, year, data_dir)
+    if df is None:
+        return []
+    df = df[df[sqlite_store.TEAM_COLS[name]] == team]
+    if "date" in df.columns:
+        df = df.sort_values("date", kind="stable")
+    return _records(df.tail(1) if last else df)
+
+
+def date_rows(name: str, year: int, date: str, data_dir: str = DATA_DIR) -> list:
+    """All rows of a weekly dataset on one date (YYYY-MM-DD)."""
+    if sqlite_store.enabled() and _sqlite_ready(name, year, data_dir):
+        rows = sqlite_store.date_rows(name, year, pd.to_datetime(date).strftime("%Y-%m-%d"), data_dir)
+        return [{k: v for k, v in r.items() if k != "year"} for r in rows]
+    df = load_dataset(name, year, data_dir)
+    if df is None or "date" not in df.columns:
+        return []
+    return _records(df[df["date"] == pd.to_datetime(date)])
+
+
+def changes_since(since: int, year: int, data_dir: str = DATA_DIR) -> dict:
+    """
+    Rows of `year` added or modified after version `since`, per dataset, plus the keys removed
+    since then: {"version": latest, "changes": {name: {"full", "rows", "removed"}}}.
+    since=0 (a client with nothing) or a version this log never issued returns every dataset in full.
+    """
+    latest, changed = changelog.changed_since(since, data_dir)
+    out = {}
+    for name in SCHEMAS:
+        if since <= 0 or since > latest:
+            slot = {"changed": None, "removed": set()}
+        else:
+            slot = changed.get((name, int(year)))
+            if slot is None:
+                continue
+        df = load_dataset(name, year, data_dir)
+        if df is None:
+            df = pd.DataFrame()
+        if slot["changed"] is not None and not df.empty:
+            df = df[pd.Series(changelog.key_strings(df, SCHEMAS[name]["keys"]), index=df.index).isin(slot["changed"])]
+        out[name] = {"full": slot["changed"] is None, "rows": _records(df), "removed": sorted(slot["removed"])}
+    return {"version": latest, "changes": out}
+
+
+_ROW_INDEXES = {}  # id(frame) -> (weakref to the frame, index)
+
+
+def row_index(name: str, df: pd.DataFrame) -> dict:
+    """
+    Team -> row positions and the date-sorted row order of a loaded dataset, built once per
+    frame object (a reloaded dataset is a new object and gets a new index).
+    """
+    key = id(df)
+    hit = _ROW_INDEXES.get(key)
+    if hit is not None and hit[0]() is df:
+        return hit[1]
+    team_col = sqlite_store.TEAM_COLS[name]
+    index = {"teams": {str(t): pos for t, pos in df.groupby(team_col, observed=True, sort=False).indices.items()}}
+    if "date" in df.columns:
+        dates = df["date"].to_numpy()
+        order = np.argsort(dates, kind="stable")
+        index["order"], index["dates"] = order, dates[order]
+    _ROW_INDEXES[key] = (weakref.ref(df, lambda _r, key=key: _ROW_INDEXES.pop(key, None)), index)
+    return index
+
+
+def select_rows(name: str, df: pd.DataFrame, teams=None, start=None, end=None, fields=None) -> pd.DataFrame:
+    """
+    Rows of `teams` (team slugs) dated start..end (inclusive, either may be None), restricted
+    to `fields`; rows keep their stored order. Uses row_index, so the cost follows the result
+    size rather than the season's. Raises KeyError for unknown fields, ValueError for dates on
+    a dataset without a date column.
+    """
+    if fields:
+        missing = [f for f in fields if f not in df.columns]
+        if missing:
+            raise KeyError(f"unknown field(s) for {name}: {', '.join(missing)}")
+    dated = start is not None or end is not None
+    if dated and "date" not in df.columns:
+        raise ValueError(f"{name} has no date column")
+    index = row_index(name, df)
+    start = np.datetime64(pd.Timestamp(start)) if start is not None else None
+    end = np.datetime64(pd.Timestamp(end)) if end is not None else None
+    if teams:
+        pos = [index["teams"][t] for t in teams if t in index["teams"]]
+        pos = np.concatenate(pos) if pos else np.empty(0, dtype=np.intp)
+        if dated:
+            d = df["date"].to_numpy()[pos]
+            keep = np.ones(len(pos), dtype=bool)
+            if start is not None:
+                keep &= d >= start
+            if end is not None:
+                keep &= d <= end
+            pos = pos[keep]
+    elif dated:
+        lo = 0 if start is None else np.searchsorted(index["dates"], start, side="left")
+        hi = len(index["dates"]) if end is None else np.searchsorted(index["dates"], end, side="right")
+        pos = index["order"][lo:hi]
+    else:
+        pos = np.arange(len(df))
+    pos = np.sort(pos)
+    if fields:  # gather only the projected columns
+        return df.iloc[pos, [df.columns.get_loc(f) for f in fields]]
+    return df.iloc[pos]
+
+
+def _synthetic_season(df: pd.DataFrame, back: int) -> pd.DataFrame:
+    """A stored season relabelled as the one `back` years earlier: its dates and URLs change,
+    as they would in a real older season; team ids and names stay."""
+    df = df.copy()
+    for col in df.columns:
+        if col == "date":
+            df[col] = df[col] - pd.DateOffset(years=back)
+        elif col == "url":
+            df[col] = df[col].astype(str) + f"?season=-{back}"
+    return df
+
+
+def memory_report(years=2025, data_dir: str = DATA_DIR, synthetic: int = 0) -> pd.DataFrame:
+    """
+    Deep memory usage per dataset with default read_csv dtypes vs. the compact schema, for the
+    stored seasons `years` (an int or a list) stacked as a multi-season worker would hold them.
+    `synthetic` adds that many made-up seasons per stored one (see _synthetic_season) to
+    estimate footprints beyond the data on disk; the `synthetic` column counts them.
+    """
+    years = [years] if isinstance(years, int) else list(years)
+    rows = []
+    for name in SCHEMAS:
+        frames = []
+        for year in years:
+            path = dataset_path(name, year, data_dir)
+            if not os.path.isfile(path):
+                continue
+            df = pd.read_csv(path)
+            if SCHEMAS[name]["dates"]:
+                df["date"] = pd.to_datetime(df["date"], errors="coerce")
+            frames += [df] + [_synthetic_season(df, k) for k in range(1, synthetic + 1)]
+        if not frames:
+            continue
+        default = pd.concat(frames, ignore_index=True)
+        compact = apply_schema(name, default)
+        d = int(default.memory_usage(deep=True).sum())
+        c = int(compact.memory_usage(deep=True).sum())
+        rows.append({"dataset": name, "seasons": len(frames), "synthetic": len(frames) // (synthetic + 1) * synthetic,
+                     "rows": len(default), "default_bytes": d, "compact_bytes": c,
+                     "ratio": round(c / d, 3) if d else np.nan})
+    out = pd.DataFrame(rows)
+    if not out.empty:
+        total = {"dataset": "total", "seasons": int(out["seasons"].max()), "synthetic": int(out["synthetic"].max()),
+                 "rows": int(out["rows"].sum()),
+                 "default_bytes": int(out["default_bytes"].sum()),
+                 "compact_bytes": int(out["compact_bytes"].sum())}
+        total["ratio"] = round(total["compact_bytes"] / total["default_bytes"], 3)
+        out = pd.concat([out, pd.DataFrame([total])], ignore_index=True)
+    return out
+
+
+def benchmark_storage(year: int = 2025, seasons: int = 20, repeat: int = 3, data_dir: str = DATA_DIR) -> pd.DataFrame:
+    """
+    Seconds to load `seasons` partitions of every dataset from CSV vs. the columnar files.
+    The seasons are copies of `year`, written to a temporary data dir.
+    """
+    import shutil
+    import tempfile
+    tmp = tempfile.mkdtemp(prefix="mlb-storage-")
+    years = list(range(year - seasons + 1, year + 1))
+    rows = []
+    try:
+        for name in SCHEMAS:
+            src = dataset_path(name, year, data_dir)
+            if not os.path.isfile(src):
+                continue
+            for y in years:
+                shutil.copyfile(src, dataset_path(name, y, tmp))
+            row = {"dataset": name, "seasons": seasons}
+            for label, columnar in (("csv_s", False), ("columnar_s", True)):
+                if columnar:
+                    load_seasons(name, years, tmp, columnar=True)  # migrate first
+                best = float("inf")
+                for _ in range(repeat):
+                    t0 = time.perf_counter()
+                    load_seasons(name, years, tmp, columnar=columnar)
+                    best = min(best, time.perf_counter() - t0)
+                row[label] = round(best, 4)
+            row["speedup"] = round(row["csv_s"] / row["columnar_s"], 1)
+            rows.append(row)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    print("--- stored 2025 season ---")
+    print(memory_report(2025).to_string(index=False))
+    print("--- 20 seasons: 2025 plus 19 synthetic ones ---")
+    print(memory_report(2025, synthetic=19).to_string(index=False))
+    if storage.available():
+        print(benchmark_storage().to_string(index=False))
@@ -0,0 +1,27 @@
+# gunicorn.conf.py
+# gunicorn -c gunicorn.conf.py app:app
+#
+# The master imports the app, loads the datasets (MLB_PRELOAD, default the 2025 season) and
+# the analytics stack once, then forks the workers: they inherit all of it copy-on-write, so
+# adding workers adds throughput without another copy of the data and libraries each.
+# A reload after a refresh is not shared: each worker converts the Feather partitions into its
+# own pandas frames (to_pandas copies), about 0.5 MB per worker per reloaded season.
+import os
+
+os.environ.setdefault("MLB_SHARED_PRELOAD", "1")  # app.py: leave the threads to post_fork
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+preload_app = True
+
+
+def when_ready(server):
+    # master, app imported, workers not forked yet
+    import app
+    app.preload_shared()
+    server.log.info(f"datasets preloaded: {app.READY}")
+
+
+def post_fork(server, worker):
+    import app
+    app.start_background()
@@ -0,0 +1,148 @@
+# http_client.py
+# Shared HTTP client for the ingestion scrapers: pooled keep-alive sessions, a token-bucket
+# rate limit per site, (connect, read) timeouts and retries with exponential backoff, so one
+# slow or flaky response can neither hang a refresh nor hammer the site.
+import json
+import threading
+import time
+from urllib.parse import urlencode, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import response_cache
+
+HTTP_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+DEFAULT_TIMEOUT = (5, 20)  # seconds: connect, read
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# requests per second and burst per site; anything else gets DEFAULT_RATE
+SITE_RATES = {
+    "www.fangraphs.com": (4.0, 4),
+    "www.mlb.com": (8.0, 8),
+    "statsapi.mlb.com": (10.0, 10),
+    "www.baseball-reference.com": (0.3, 1),  # bbref blocks clients above ~20 requests/minute
+}
+DEFAULT_RATE = (5.0, 5)
+
+
+class TokenBucket:
+    """`rate` tokens per second, holding at most `burst`; acquire() blocks until one is free."""
+
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+                self._stamp = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class RetryableStatus(requests.RequestException):
+    """Raised for a response status worth retrying (429 / 5xx)."""
+
+
+def call_with_retries(fn, retries=3, backoff=0.5, limiter=None):
+    """fn() with up to `retries` extra attempts, sleeping backoff * 2**attempt between them."""
+    for attempt in range(retries + 1):
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            return fn()
+        except Exception:
+            if attempt == retries:
+                raise
+            time.sleep(backoff * 2 ** attempt)
+
+
+class HttpClient:
+    """
+    GETs through one keep-alive requests.Session per thread (sessions are not thread safe),
+    every attempt paced by a shared TokenBucket. get() retries connection errors and
+    429/5xx responses with exponential backoff and returns the final Response.
+    """
+
+    def __init__(self, rate=DEFAULT_RATE[0], burst=DEFAULT_RATE[1], timeout=DEFAULT_TIMEOUT,
+                 retries=3, backoff=0.5, pool_size=16, headers=None):
+        self.bucket = TokenBucket(rate, burst)
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.pool_size = pool_size
+        self.headers = dict(HTTP_HEADERS if headers is None else headers)
+        self._local = threading.local()
+
+    @property
+    def session(self):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            session.headers.update(self.headers)
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        return session
+
+    def _get_once(self, url, params):
+        resp = self.session.get(url, params=params, timeout=self.timeout)
+        if resp.status_code in RETRY_STATUSES:
+            raise RetryableStatus(f"{resp.status_code} from {url}", response=resp)
+        return resp
+
+    def get(self, url, params=None):
+        return call_with_retries(lambda: self._get_once(url, params),
+                                 retries=self.retries, backoff=self.backoff, limiter=self.bucket)
+
+    def _text(self, url, params):
+        try:
+            resp = self.get(url, params)
+        except requests.RequestException:
+            return None
+        return resp.text if resp.status_code == 200 else None
+
+    def get_text(self, url, params=None, ttl=0):
+        """
+        Body of a 200 response, or None on any failure. ttl > 0 goes through the on-disk
+        response cache (response_cache.FOREVER for immutable pages). In replay mode every
+        request is answered from the cache, whatever the ttl (CacheMiss if never recorded).
+        """
+        if not ttl and response_cache.get_mode() != "replay":
+            return self._text(url, params)
+        key = f"{url}?{urlencode(sorted(params.items()))}" if params else url
+        return response_cache.fetch(urlparse(url).netloc, key, lambda: self._text(url, params), ttl)
+
+    def get_json(self, url, params=None, ttl=0):
+        """Decoded JSON of a 200 response, or None on any failure."""
+        text = self.get_text(url, params, ttl)
+        try:
+            return json.loads(text) if text is not None else None
+        except ValueError:
+            return None
+
+
+_CLIENTS = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def get_client(url_or_host):
+    """The shared HttpClient for a site (one rate budget per host across all callers)."""
+    host = urlparse(url_or_host).netloc or url_or_host
+    with _CLIENTS_LOCK:
+        if host not in _CLIENTS:
+            rate, burst = SITE_RATES.get(host, DEFAULT_RATE)
+            _CLIENTS[host] = HttpClient(rate=rate, burst=burst)
+        return _CLIENTS[host]
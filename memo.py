@@ -0,0 +1,137 @@
+# memo.py
+# Content-addressed memoization for the analytics functions.
+# DataFrame arguments are keyed by a hash of their content, computed once per object: a
+# reload with changed rows gets a new fingerprint, an identical reload shares the entries.
+# Frames passed to memoized functions must be treated as immutable (copy before modifying).
+import copy
+import functools
+import hashlib
+import inspect
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Callable, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+_FINGERPRINTS: Dict[int, Tuple[weakref.ref, str]] = {}
+_FP_LOCK = threading.Lock()
+
+
+def frame_fingerprint(df: pd.DataFrame | pd.Series | None) -> str:
+    """
+    Content fingerprint (shape, columns, dtypes and a hash of the values) of a DataFrame/Series.
+    Equal content gives an equal fingerprint, so a reloaded dataset with the same rows reuses
+    the cached results. The hash is cached by object id, so mutating a frame in place after it
+    was fingerprinted returns the stale fingerprint: treat the frames as immutable.
+    """
+    if df is None:
+        return "none"
+    key = id(df)
+    hit = _FINGERPRINTS.get(key)
+    if hit is not None and hit[0]() is df:
+        return hit[1]
+    cols = [str(df.name)] if isinstance(df, pd.Series) else [str(c) for c in df.columns]
+    dtypes = [str(df.dtype)] if isinstance(df, pd.Series) else [str(t) for t in df.dtypes]
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr((df.shape, cols, dtypes)).encode())
+    h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    fp = h.hexdigest()
+    ref = weakref.ref(df, lambda _r, key=key: _FINGERPRINTS.pop(key, None))
+    with _FP_LOCK:
+        _FINGERPRINTS[key] = (ref, fp)
+    return fp
+
+
+def _normalize(value):
+    """Turn an argument into a hashable, order-stable cache key component."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return ("frame", frame_fingerprint(value))
+    if isinstance(value, np.ndarray):
+        arr = np.ascontiguousarray(value)
+        return ("ndarray", str(arr.dtype), arr.shape, hashlib.blake2b(arr.tobytes(), digest_size=16).hexdigest())
+    if isinstance(value, dict):
+        return ("dict", tuple(sorted(((repr(k), _normalize(v)) for k, v in value.items()))))
+    if isinstance(value, (list, tuple)):
+        return ("seq", tuple(_normalize(v) for v in value))
+    if isinstance(value, (set, frozenset)):
+        return ("set", tuple(sorted(repr(v) for v in value)))
+    if isinstance(value, np.generic):
+        return value.item()
+    try:
+        hash(value)
+    except TypeError:
+        return ("repr", repr(value))
+    return value
+
+
+_REGISTRY: "OrderedDict[str, Callable]" = OrderedDict()
+
+
+def memoize(maxsize: int = 128, ttl: float | None = None):
+    """
+    LRU (+ optional TTL seconds) memoization keyed on dataset fingerprints and the
+    normalized, default-filled arguments. Hits return a deep copy so callers can't
+    mutate the cached result. The wrapper exposes cache_info() and cache_clear().
+    """
+    def decorator(func):
+        sig = inspect.signature(func)
+        cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+        lock = threading.Lock()
+        stats = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0}
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = sig.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = tuple((name, _normalize(v)) for name, v in bound.arguments.items())
+            now = time.monotonic()
+            with lock:
+                hit = cache.get(key)
+                if hit is not None and (ttl is None or now - hit[0] <= ttl):
+                    cache.move_to_end(key)
+                    stats["hits"] += 1
+                    return copy.deepcopy(hit[1])
+                if hit is not None:
+                    del cache[key]
+                    stats["expired"] += 1
+                stats["misses"] += 1
+
+            result = func(*args, **kwargs)
+
+            with lock:
+                cache[key] = (now, copy.deepcopy(result))
+                cache.move_to_end(key)
+                while len(cache) > maxsize:
+                    cache.popitem(last=False)
+                    stats["evictions"] += 1
+            return result
+
+        def cache_info() -> dict:
+            with lock:
+                calls = stats["hits"] + stats["misses"]
+                return {**stats, "size": len(cache), "maxsize": maxsize, "ttl": ttl,
+                        "hit_rate": (stats["hits"] / calls) if calls else None}
+
+        def cache_clear() -> None:
+            with lock:
+                cache.clear()
+
+        wrapper.cache_info = cache_info
+        wrapper.cache_clear = cache_clear
+        _REGISTRY[f"{func.__module__}.{func.__qualname__}"] = wrapper
+        return wrapper
+
+    return decorator
+
+
+def cache_stats() -> dict:
+    """{qualified function name -> cache_info()} for every memoized function."""
+    return {name: fn.cache_info() for name, fn in _REGISTRY.items()}
+
+
+def clear_caches() -> None:
+    for fn in _REGISTRY.values():
+        fn.cache_clear()
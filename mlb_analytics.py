@@ -1,18 +1,44 @@
-from mlb_rankings import *
 import numpy as np
 import pandas as pd
 from typing import Iterable, Tuple, Literal, Dict, List, Union
 from functools import reduce
-from statsmodels.tsa.stattools import grangercausalitytests
-from sklearn.preprocessing import StandardScaler
-from scipy.spatial.distance import pdist
-from scipy.cluster.hierarchy import linkage, fcluster
-from sklearn.cluster import KMeans
-from hmmlearn.hmm import GaussianHMM
+from collections import OrderedDict
+import importlib
+from memo import frame_fingerprint, memoize
+
+# statsmodels / sklearn / scipy / hmmlearn are imported inside the functions that use
+# them, and the scraping functions (selenium, statsapi) are resolved lazily below, so
+# `import mlb_analytics` stays cheap for the web server. Call warmup() to pay up front.
+_HEAVY_MODULES = (
+    "statsmodels.tsa.stattools",
+    "sklearn.preprocessing",
+    "sklearn.cluster",
+    "scipy.spatial.distance",
+    "scipy.cluster.hierarchy",
+    "hmmlearn.hmm",
+)
+_INGESTION_MODULES = ("power_rankings", "table_rankings", "mlb_rankings")
+
+def warmup(ingestion: bool = False) -> None:
+    """Import the heavy analytics dependencies now (and the scrapers if ingestion=True)."""
+    for name in _HEAVY_MODULES + (_INGESTION_MODULES if ingestion else ()):
+        importlib.import_module(name)
+
+def __getattr__(name: str):
+    # Backwards compatible access to the scraping functions that used to be star-imported
+    # from mlb_rankings (mlb_analytics.sunday_power, ...), without importing them eagerly.
+    if name.startswith("__"):
+        raise AttributeError(name)
+    mod = importlib.import_module("mlb_rankings")
+    try:
+        return getattr(mod, name)
+    except AttributeError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
 
 
 Mode = Literal["power", "mlb", "diff", "both"]
 
+@memoize(maxsize=256)
 def build_plot_table(
     power: pd.DataFrame,
     standings: pd.DataFrame,
@@ -181,6 +207,7 @@ def _rank_deltas_from_series(rank_series: pd.Series) -> np.ndarray:
 # -------------------------------------------------------------------
 # Main data builder for Δrank KDE + histogram
 # -------------------------------------------------------------------
+@memoize(maxsize=256)
 def build_delta_kde_and_hist(
     power: pd.DataFrame,
     standings: pd.DataFrame,
@@ -289,6 +316,7 @@ def build_delta_kde_and_hist(
     return kde_df, hist_df, peaks, bws
 
 
+@memoize(maxsize=256)
 def build_rank_volatility(
     power: pd.DataFrame,
     standings: pd.DataFrame,
@@ -398,6 +426,7 @@ def _acf_to_stability(acf_df: pd.DataFrame, alpha: float = 0.25) -> pd.DataFrame
 
 # ---------- public data-prep ----------
 
+@memoize(maxsize=256)
 def build_acf_stability_timeseries(
     power: pd.DataFrame,
     standings: pd.DataFrame,
@@ -509,11 +538,12 @@ def _aligned_power_mlb(
                  .rename(columns={"mlb_rank": "mlb"}))
 
     df = p.join(m, how="inner").dropna()
-    df["power"] = pd.to_numeric(df["power"], errors="coerce")
-    df["mlb"]   = pd.to_numeric(df["mlb"],   errors="coerce")
+    df["power"] = pd.to_numeric(df["power"], errors="coerce").astype(float)
+    df["mlb"]   = pd.to_numeric(df["mlb"],   errors="coerce").astype(float)
     return df.dropna()
 
 
+@memoize(maxsize=256)
 def granger_power_to_mlb_report(
     power: pd.DataFrame,
     standings: pd.DataFrame,
@@ -576,6 +606,7 @@ def granger_power_to_mlb_report(
     stats["maxlag_effective"] = eff_maxlag
 
     # 4) Run Granger: column 2 (power) causes column 1 (mlb)
+    from statsmodels.tsa.stattools import grangercausalitytests
     arr = df[["mlb", "power"]].values
     res = grangercausalitytests(arr, maxlag=eff_maxlag, verbose=False)
 
@@ -643,6 +674,7 @@ def _dtw_distance_with_steps(a: np.ndarray, b: np.ndarray) -> Tuple[float, int]:
 
 # -- main ---------------------------------------------------------------
 
+@memoize(maxsize=256)
 def compute_trajectory_similarity(
     power: pd.DataFrame,
     standings: pd.DataFrame,
@@ -777,6 +809,7 @@ def build_feature_matrix_single(
 
     cols_kept = M.columns.tolist()
     if scale and cols_kept:
+        from sklearn.preprocessing import StandardScaler
         scaler = StandardScaler()
         M[cols_kept] = scaler.fit_transform(M[cols_kept])
 
@@ -790,16 +823,88 @@ def cluster_teams_stats_single(
 ) -> pd.DataFrame:
     if linkage_method == "ward" and metric != "euclidean":
         raise ValueError("Ward linkage requires Euclidean distance.")
+    from scipy.spatial.distance import pdist
+    from scipy.cluster.hierarchy import linkage, fcluster
     D = pdist(M.values, metric=metric)
     Z = linkage(D, method=linkage_method)
     labels = fcluster(Z, t=k, criterion='maxclust')
     return pd.DataFrame({"team_name": M.index.tolist(), "cluster": labels})
 
+# ---------- clustering caches (keyed by dataset fingerprints) ----------
+_CLUSTER_CACHE_SIZE = 64
+_LINKAGE_CACHE: "OrderedDict[tuple, tuple]" = OrderedDict()
+_CUT_CACHE: "OrderedDict[tuple, pd.DataFrame]" = OrderedDict()
+_SUMMARY_CACHE: "OrderedDict[tuple, pd.DataFrame]" = OrderedDict()
+_OUTCOME_CACHE: "OrderedDict[tuple, tuple]" = OrderedDict()
+
+def _cache_get(cache: OrderedDict, key: tuple):
+    if key in cache:
+        cache.move_to_end(key)
+        return cache[key]
+    return None
+
+def _cache_put(cache: OrderedDict, key: tuple, value):
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > _CLUSTER_CACHE_SIZE:
+        cache.popitem(last=False)
+    return value
+
+def clear_cluster_caches() -> None:
+    for cache in (_LINKAGE_CACHE, _CUT_CACHE, _SUMMARY_CACHE, _OUTCOME_CACHE):
+        cache.clear()
+
+def _linkage_key(
+    batting, pitching, fielding, which, use_cols, drop_cols_contains, scale, linkage_method, metric
+) -> tuple:
+    cols_key = tuple(sorted((k, tuple(v)) for k, v in use_cols.items())) if use_cols else None
+    drop_key = tuple(drop_cols_contains) if drop_cols_contains else None
+    return (frame_fingerprint(batting), frame_fingerprint(pitching), frame_fingerprint(fielding),
+            which, cols_key, drop_key, bool(scale), linkage_method, metric)
+
+def build_cluster_linkage(
+    batting: pd.DataFrame | None = None,
+    pitching: pd.DataFrame | None = None,
+    fielding: pd.DataFrame | None = None,
+    which: str = "combo",
+    use_cols: dict | None = None,
+    drop_cols_contains: list[str] | None = None,
+    scale: bool = True,
+    linkage_method: str = "ward",
+    metric: str = "euclidean"
+) -> tuple[pd.DataFrame, list[str], np.ndarray]:
+    """
+    Feature matrix + hierarchical linkage tree, cached per dataset version.
+    Returns (M, feature_columns, Z); cut Z with `cut_cluster_linkage` for any k.
+    """
+    if linkage_method == "ward" and metric != "euclidean":
+        raise ValueError("Ward linkage requires Euclidean distance.")
+    key = _linkage_key(batting, pitching, fielding, which, use_cols,
+                       drop_cols_contains, scale, linkage_method, metric)
+    hit = _cache_get(_LINKAGE_CACHE, key)
+    if hit is not None:
+        return hit
+    from scipy.spatial.distance import pdist
+    from scipy.cluster.hierarchy import linkage
+    M, feat_cols = build_feature_matrix_single(
+        batting=batting, pitching=pitching, fielding=fielding,
+        which=which, use_cols=use_cols,
+        drop_cols_contains=drop_cols_contains, scale=scale
+    )
+    Z = linkage(pdist(M.values, metric=metric), method=linkage_method)
+    return _cache_put(_LINKAGE_CACHE, key, (M, feat_cols, Z))
+
+def cut_cluster_linkage(M: pd.DataFrame, Z: np.ndarray, k: int) -> pd.DataFrame:
+    """Flat clusters for `k` from a precomputed linkage tree (same shape as cluster_teams_stats_single)."""
+    from scipy.cluster.hierarchy import fcluster
+    labels = fcluster(Z, t=k, criterion='maxclust')
+    return pd.DataFrame({"team_name": M.index.tolist(), "cluster": labels})
+
 def last_mlb_rank_per_team(standings: pd.DataFrame) -> pd.Series:
     s = standings.copy()
     s['date'] = pd.to_datetime(s['date'])
     s = s.sort_values(['team_name','date'])
-    last_rank = s.groupby('team_name').tail(1).set_index('team_name')['mlb_rank']
+    last_rank = s.groupby('team_name', observed=True).tail(1).set_index('team_name')['mlb_rank']
     return last_rank
 
 def playoff_team_ids_from_odds(odds: pd.DataFrame) -> set:
@@ -815,13 +920,21 @@ def playoff_team_ids_from_odds(odds: pd.DataFrame) -> set:
     made = final.loc[final[col] >= 1.0, 'team_name']
     return set(made.tolist())
 
+def _season_outcomes(standings: pd.DataFrame, odds: pd.DataFrame) -> tuple[pd.Series, set]:
+    """(last MLB rank per team, playoff team ids), cached per standings/odds version."""
+    key = (frame_fingerprint(standings), frame_fingerprint(odds))
+    hit = _cache_get(_OUTCOME_CACHE, key)
+    if hit is not None:
+        return hit
+    return _cache_put(_OUTCOME_CACHE, key,
+                      (last_mlb_rank_per_team(standings), playoff_team_ids_from_odds(odds)))
+
 def summarize_clusters_by_last_rank(
     clusters: pd.DataFrame,
     standings: pd.DataFrame,
     odds: pd.DataFrame
 ) -> pd.DataFrame:
-    last_rank = last_mlb_rank_per_team(standings)
-    playoffs = playoff_team_ids_from_odds(odds)
+    last_rank, playoffs = _season_outcomes(standings, odds)
 
     rows = []
     for c, g in clusters.groupby('cluster'):
@@ -864,18 +977,239 @@ def cluster_and_summarize_season_stats(
     Build features -> cluster teams -> summarize by last MLB rank + playoff odds.
     Returns the summary DataFrame. If return_intermediates=True, also returns
     a dict with the feature matrix, columns, and raw clusters.
+
+    The feature matrix and linkage tree are cached per dataset version and the
+    per-k cut + summary are cached in the same way, so sweeping k only pays for the first call.
     """
-    M, feat_cols = build_feature_matrix_single(
+    lkey = _linkage_key(batting, pitching, fielding, which, use_cols,
+                        drop_cols_contains, scale, linkage_method, metric)
+    M, feat_cols, Z = build_cluster_linkage(
         batting=batting, pitching=pitching, fielding=fielding,
-        which=which, use_cols=use_cols,
-        drop_cols_contains=drop_cols_contains, scale=scale
+        which=which, use_cols=use_cols, drop_cols_contains=drop_cols_contains,
+        scale=scale, linkage_method=linkage_method, metric=metric
+    )
+
+    clusters = _cache_get(_CUT_CACHE, lkey + (k,))
+    if clusters is None:
+        clusters = _cache_put(_CUT_CACHE, lkey + (k,), cut_cluster_linkage(M, Z, k))
+
+    skey = lkey + (k, frame_fingerprint(standings), frame_fingerprint(odds))
+    summary = _cache_get(_SUMMARY_CACHE, skey)
+    if summary is None:
+        summary = _cache_put(_SUMMARY_CACHE, skey,
+                             summarize_clusters_by_last_rank(clusters, standings, odds))
+
+    # hand out copies so callers can't mutate the cached frames
+    if not return_intermediates:
+        return summary.copy()
+    return summary.copy(), {"features": M.copy(), "feature_columns": list(feat_cols), "clusters": clusters.copy()}
+
+# ---------- multi-season clustering (team-seasons across many years) ----------
+def _season_label(team_name, season) -> str:
+    return f"{team_name}:{int(season)}"
+
+def _with_season(df: pd.DataFrame, season_col: str) -> pd.DataFrame:
+    """Ensure a `season_col` column; falls back to the calendar year of 'date'."""
+    if season_col in df.columns:
+        return df
+    if "date" not in df.columns:
+        raise ValueError(f"expected a '{season_col}' or 'date' column")
+    return df.assign(**{season_col: pd.to_datetime(df["date"]).dt.year})
+
+def _prep_multi(df: pd.DataFrame, prefix: str, season_col: str) -> pd.DataFrame:
+    assert 'team_name' in df.columns, f"{prefix}: expected a 'team_name' column"
+    assert season_col in df.columns, f"{prefix}: expected a '{season_col}' column"
+    num_cols = [c for c in df.select_dtypes(include=[np.number]).columns if c != season_col]
+    out = df[['team_name', season_col] + num_cols].copy()
+    out['team_name'] = out['team_name'].astype(str)
+    return out.rename(columns={c: f"{prefix}_{c}" for c in num_cols})
+
+def build_feature_matrix_multi(
+    batting: pd.DataFrame | None = None,
+    pitching: pd.DataFrame | None = None,
+    fielding: pd.DataFrame | None = None,
+    which: str = "combo",
+    drop_cols_contains: list[str] | None = None,
+    season_col: str = "season",
+    scale: bool = True,
+    scale_within_season: bool = False,
+) -> tuple[pd.DataFrame, list[str]]:
+    """
+    Team-season feature matrix: one row per (team_name, season), indexed by
+    "team_name:season" labels. Same column conventions as build_feature_matrix_single.
+    scale_within_season=True z-scores each season separately (removes era drift).
+    """
+    pieces = []
+    if which in ("batting", "combo") and batting is not None:
+        pieces.append(_prep_multi(batting, "bat", season_col))
+    if which in ("pitching", "combo") and pitching is not None:
+        pieces.append(_prep_multi(pitching, "pit", season_col))
+    if which in ("fielding", "combo") and fielding is not None:
+        pieces.append(_prep_multi(fielding, "fld", season_col))
+    if not pieces:
+        raise ValueError("No stats provided; pass batting/pitching/fielding and set 'which'.")
+
+    M = reduce(lambda a, b: a.merge(b, on=['team_name', season_col], how='inner'), pieces)
+    if drop_cols_contains:
+        drop_me = [c for c in M.columns
+                   if c not in ("team_name", season_col) and any(tok in c for tok in drop_cols_contains)]
+        M = M.drop(columns=drop_me, errors='ignore')
+
+    M.index = [_season_label(t, y) for t, y in zip(M['team_name'], M[season_col])]
+    M.index.name = 'team_name'
+    seasons = M[season_col].to_numpy()
+    M = M.drop(columns=['team_name', season_col]).astype('float64')
+    M = M.fillna(M.median())
+
+    cols_kept = M.columns.tolist()
+    if scale and cols_kept:
+        if scale_within_season:
+            g = M.groupby(seasons)
+            sd = g.transform('std', ddof=0)
+            M = (M - g.transform('mean')) / sd.where(sd > 0, 1.0)
+        else:
+            from sklearn.preprocessing import StandardScaler
+            M[cols_kept] = StandardScaler().fit_transform(M[cols_kept])
+    return M, cols_kept
+
+def _weighted_ward_labels(C: np.ndarray, w: np.ndarray, k: int) -> np.ndarray:
+    """
+    Ward agglomeration of weighted centroids down to k groups.
+    Merge cost is the Ward increase  w_a*w_b/(w_a+w_b) * ||c_a - c_b||^2.
+    Returns labels 1..k for each centroid (fcluster numbering).
+    """
+    m = len(C)
+    C = C.astype('float64').copy()
+    w = w.astype('float64').copy()
+    members = [[i] for i in range(m)]
+    alive = np.ones(m, dtype=bool)
+
+    def cost_row(i):
+        ww = w[i] * w / (w[i] + w)
+        return ww * ((C - C[i]) ** 2).sum(axis=1)
+
+    D = np.vstack([cost_row(i) for i in range(m)])
+    np.fill_diagonal(D, np.inf)
+    for _ in range(m - max(int(k), 1)):
+        a, b = divmod(int(np.argmin(D)), m)
+        a, b = min(a, b), max(a, b)
+        C[a] = (w[a] * C[a] + w[b] * C[b]) / (w[a] + w[b])
+        w[a] += w[b]
+        members[a] += members[b]
+        alive[b] = False
+        D[b, :] = D[:, b] = np.inf
+        row = np.where(alive, cost_row(a), np.inf)
+        row[a] = np.inf
+        D[a, :] = D[:, a] = row
+
+    labels = np.empty(m, dtype=int)
+    for lab, i in enumerate(np.flatnonzero(alive), start=1):
+        labels[members[i]] = lab
+    return labels
+
+def cluster_team_seasons_scalable(
+    M: pd.DataFrame,
+    k: int = 6,
+    n_micro: int = 256,
+    batch_size: int = 2048,
+    random_state: int = 0,
+) -> pd.DataFrame:
+    """
+    Memory-bounded Ward clustering for thousands of team-seasons.
+
+    Up to `n_micro` rows this is exact Ward (pdist + linkage). Above that, rows are
+    compressed to `n_micro` mini-batch k-means centroids and the centroids are
+    agglomerated with size-weighted Ward, so memory is O(n*d + n_micro^2)
+    instead of the O(n^2) condensed distance matrix.
+    Returns ['team_name','cluster'] like cluster_teams_stats_single.
+    """
+    X = M.to_numpy(dtype='float64')
+    if len(X) <= n_micro:
+        return cluster_teams_stats_single(M, k=k)
+
+    from sklearn.cluster import MiniBatchKMeans
+    km = MiniBatchKMeans(n_clusters=n_micro, batch_size=batch_size,
+                         n_init=3, random_state=random_state)
+    micro = km.fit_predict(X)
+    sizes = np.bincount(micro, minlength=n_micro)
+    used = np.flatnonzero(sizes)  # mini-batch can leave empty centers
+    centroid_labels = np.zeros(n_micro, dtype=int)
+    centroid_labels[used] = _weighted_ward_labels(km.cluster_centers_[used], sizes[used], k)
+    return pd.DataFrame({"team_name": M.index.tolist(), "cluster": centroid_labels[micro]})
+
+def _label_by_season(df: pd.DataFrame, season_col: str) -> pd.DataFrame:
+    df = _with_season(df, season_col)
+    return df.assign(team_name=[_season_label(t, y) for t, y in zip(df['team_name'], df[season_col])])
+
+@memoize(maxsize=16)
+def cluster_and_summarize_multi_season_stats(
+    standings: pd.DataFrame,
+    odds: pd.DataFrame,
+    batting: pd.DataFrame | None = None,
+    pitching: pd.DataFrame | None = None,
+    fielding: pd.DataFrame | None = None,
+    which: str = "combo",
+    drop_cols_contains: list[str] | None = None,
+    season_col: str = "season",
+    scale: bool = True,
+    scale_within_season: bool = False,
+    k: int = 6,
+    n_micro: int = 256,
+    return_intermediates: bool = False
+):
+    """
+    Multi-season counterpart of cluster_and_summarize_season_stats.
+    Stats frames need a `season_col` column; standings/odds may use it or
+    fall back to the year of 'date'. Output has the same shape as
+    summarize_clusters_by_last_rank, with `teams` listing "team_name:season".
+    """
+    M, feat_cols = build_feature_matrix_multi(
+        batting=batting, pitching=pitching, fielding=fielding, which=which,
+        drop_cols_contains=drop_cols_contains, season_col=season_col,
+        scale=scale, scale_within_season=scale_within_season
     )
-    clusters = cluster_teams_stats_single(M, k=k, linkage_method=linkage_method, metric=metric)
-    summary = summarize_clusters_by_last_rank(clusters, standings, odds)
+    clusters = cluster_team_seasons_scalable(M, k=k, n_micro=n_micro)
+
+    std = _label_by_season(standings, season_col)
+    odd = _label_by_season(odds, season_col)
+    # last date per season (not the global max) decides playoff teams
+    odd = odd[odd['date'] == odd.groupby(season_col)['date'].transform('max')].assign(date=pd.Timestamp(0))
+    summary = summarize_clusters_by_last_rank(clusters, std, odd)
     if not return_intermediates:
         return summary
     return summary, {"features": M, "feature_columns": feat_cols, "clusters": clusters}
 
+def benchmark_multi_season_clustering(
+    n_rows: int = 6000,
+    n_features: int = 80,
+    k: int = 6,
+    n_micro: int = 256,
+    seed: int = 0,
+) -> dict:
+    """
+    Time the scalable path on synthetic team-seasons and compare against what
+    exact Ward would need for its condensed distance matrix.
+    """
+    import time
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(scale=3.0, size=(k, n_features))
+    X = centers[rng.integers(0, k, n_rows)] + rng.normal(size=(n_rows, n_features))
+    M = pd.DataFrame(X, index=[f"team-{i % 30}:{1900 + i // 30}" for i in range(n_rows)])
+
+    t0 = time.perf_counter()
+    out = cluster_team_seasons_scalable(M, k=k, n_micro=n_micro, random_state=seed)
+    elapsed = time.perf_counter() - t0
+    return {
+        "n_rows": n_rows,
+        "n_features": n_features,
+        "k": k,
+        "n_micro": n_micro,
+        "seconds": round(elapsed, 3),
+        "clusters_found": int(out["cluster"].nunique()),
+        "pdist_mb_exact_ward": round(n_rows * (n_rows - 1) / 2 * 8 / 2**20, 1),
+        "working_set_mb": round((X.nbytes + n_micro * n_micro * 8) / 2**20, 1),
+    }
+
 # ----------------------------- league-aware feature prep -----------------------------
 def _z_per_date(s: pd.Series) -> pd.Series:
     mu = s.mean()
@@ -885,35 +1219,94 @@ def _z_per_date(s: pd.Series) -> pd.Series:
         return (s - mu) / 1.0  # fallback to denom = 1
     else:
         return (s - mu) / sd
-    
-def prepare_power_features_for_hmm(power: pd.DataFrame) -> pd.DataFrame:
-    """
-    Input  power: ['team','date','rank'] with team = display name, rank = numeric, weekly rows.
-    Output powerx: original + engineered features:
-        level, d_rank, improve, mom3, level_z, chg_z, mom3_z, level_dev
-    """
-    powerx = power.copy(deep=True)
+
+def _z_by_date(df: pd.DataFrame, col: str) -> pd.Series:
+    """Vectorized _z_per_date: grouped mean/std reductions instead of a Python callback."""
+    g = df.groupby('date')[col]
+    mu = g.transform('mean')
+    sd = g.transform('std', ddof=0)
+    sd = sd.where(np.isfinite(sd) & (sd != 0), 1.0)
+    return (df[col] - mu) / sd
+
+_HMM_FEATURE_COLS = ['level', 'd_rank', 'improve', 'mom3', 'level_z', 'chg_z', 'mom3_z', 'level_dev']
+
+def _clean_power_for_hmm(power: pd.DataFrame) -> pd.DataFrame:
+    powerx = power.copy()
     powerx['date'] = pd.to_datetime(powerx['date']).dt.tz_localize(None)
-    powerx['rank'] = pd.to_numeric(powerx['rank'], errors='coerce')
-    powerx = powerx.dropna(subset=['date', 'rank']).sort_values(['team', 'date'])
+    powerx['rank'] = pd.to_numeric(powerx['rank'], errors='coerce').astype('float64')  # no pd.NA downstream
+    return powerx.dropna(subset=['date', 'rank'])
 
+def _add_team_features(powerx: pd.DataFrame) -> pd.DataFrame:
+    """level, d_rank, improve, mom3 (within-team, needs rows sorted by team/date)."""
     powerx['level']   = -powerx['rank']  # higher better
-    powerx['d_rank']  = powerx.groupby('team')['rank'].diff()
+    powerx['d_rank']  = powerx.groupby('team', observed=True)['rank'].diff()
     powerx['improve'] = -powerx['d_rank']  # + means improved rank
-    powerx['mom3']    = (powerx.groupby('team')['improve']
+    powerx['mom3']    = (powerx.groupby('team', observed=True)['improve']
                          .rolling(3, min_periods=1).sum()
                          .reset_index(level=0, drop=True))
+    return powerx
 
-    # cross-sectional z by date
-    powerx['level_z'] = powerx.groupby('date')['level'].transform(_z_per_date)
-    powerx['chg_z']   = powerx.groupby('date')['improve'].transform(_z_per_date)
-    powerx['mom3_z']  = (powerx.groupby('date')['mom3'].transform(_z_per_date)
-                         .fillna(0.0))
+def _add_date_features(powerx: pd.DataFrame) -> pd.DataFrame:
+    """Cross-sectional z-scores by date."""
+    powerx['level_z'] = _z_by_date(powerx, 'level')
+    powerx['chg_z']   = _z_by_date(powerx, 'improve')
+    powerx['mom3_z']  = _z_by_date(powerx, 'mom3').fillna(0.0)
+    return powerx
 
+def _add_level_dev(powerx: pd.DataFrame) -> pd.DataFrame:
     # team-relative level deviation (keeps level signal without swamping change)
-    powerx['level_dev'] = powerx['level_z'] - powerx.groupby('team')['level_z'].transform('mean')
+    powerx['level_dev'] = powerx['level_z'] - powerx.groupby('team', observed=True)['level_z'].transform('mean')
     return powerx
 
+@memoize(maxsize=8)
+def prepare_power_features_for_hmm(power: pd.DataFrame) -> pd.DataFrame:
+    """
+    Input  power: ['team','date','rank'] with team = display name, rank = numeric, weekly rows.
+    Output powerx: original + engineered features:
+        level, d_rank, improve, mom3, level_z, chg_z, mom3_z, level_dev
+    """
+    powerx = _clean_power_for_hmm(power).sort_values(['team', 'date'])
+    powerx = _add_team_features(powerx)
+    powerx = _add_date_features(powerx)
+    return _add_level_dev(powerx)
+
+def append_power_features(powerx: pd.DataFrame, new_power: pd.DataFrame) -> pd.DataFrame:
+    """
+    Incrementally extend a prepare_power_features_for_hmm() frame with new ranking rows
+    (typically one appended week). Only the affected teams' trailing window, the new
+    dates' cross-sections and the affected teams' level_dev are recomputed.
+    Falls back to a full rebuild if the new rows are not strictly after each team's history.
+    """
+    new = _clean_power_for_hmm(new_power)
+    if new.empty:
+        return powerx
+    base_cols = [c for c in powerx.columns if c not in _HMM_FEATURE_COLS]
+    last_seen = powerx.groupby('team', observed=True)['date'].max()
+    prev = new['team'].map(last_seen)
+    if (prev.notna() & (new['date'] <= prev)).any():
+        full = pd.concat([powerx[base_cols], new[base_cols]])
+        return prepare_power_features_for_hmm(full)
+
+    teams = new['team'].unique()
+    dates = new['date'].unique()
+
+    # 1) within-team features: the last 3 rows per team are enough context for diff + 3-week momentum
+    context = powerx.loc[powerx['team'].isin(teams)].groupby('team', observed=True).tail(3)
+    window = pd.concat([context[base_cols].assign(_new=False), new[base_cols].assign(_new=True)])
+    window = _add_team_features(window.sort_values(['team', 'date']))
+    fresh = window.loc[window.pop('_new').to_numpy()]
+
+    # 2) cross-sectional z for the new dates only (existing rows on those dates are included)
+    same_dates = powerx['date'].isin(dates)
+    cross = _add_date_features(pd.concat([powerx.loc[same_dates], fresh]))
+    out = pd.concat([powerx.loc[~same_dates], cross], ignore_index=True)
+
+    # 3) level_dev changes for every row of the affected teams
+    hit = out['team'].isin(teams).to_numpy()
+    team_mean = out.loc[hit].groupby('team', observed=True)['level_z'].mean()
+    out['level_dev'] = np.where(hit, out['level_z'] - out['team'].map(team_mean).astype(float), out['level_dev'])
+    return out.sort_values(['team', 'date'])
+
 # ----------------------------- utilities -----------------------------
 def stationary_power(P: np.ndarray, iters: int = 1000, tol: float = 1e-12) -> np.ndarray:
     v = np.ones(P.shape[0]) / P.shape[0]
@@ -935,6 +1328,7 @@ def _means_init_quantiles(g_fit: pd.DataFrame) -> np.ndarray:
     return np.vstack([mean_good, mean_med, mean_bad])  # Good, Med, Bad
 
 def _means_init_kmeans(X: np.ndarray) -> np.ndarray:
+    from sklearn.cluster import KMeans
     km = KMeans(n_clusters=3, n_init=10, random_state=42, algorithm="lloyd")
     labs = km.fit_predict(X)
     centers = km.cluster_centers_
@@ -943,7 +1337,8 @@ def _means_init_kmeans(X: np.ndarray) -> np.ndarray:
     order = np.argsort(centers @ w)[::-1]
     return centers[order]
 
-def _fit_with_init(X: np.ndarray, means_init: np.ndarray) -> GaussianHMM:
+def _fit_with_init(X: np.ndarray, means_init: np.ndarray) -> "GaussianHMM":
+    from hmmlearn.hmm import GaussianHMM
     cov_floor = 1e-3
     cov_init  = np.maximum(np.var(X, axis=0, ddof=1), cov_floor)
     covars_init = np.vstack([cov_init, cov_init, cov_init])
@@ -969,6 +1364,7 @@ def _fit_with_init(X: np.ndarray, means_init: np.ndarray) -> GaussianHMM:
     return hmm
 
 # ----------------------------- main: fit a single team -----------------------------
+@memoize(maxsize=256)
 def fit_team_hmm(
     power: pd.DataFrame,
     team_code: str,                         # CODE ONLY (e.g., "NYY")
@@ -1190,3 +1586,9 @@ def fit_team_hmm(
     pi_df    = pd.DataFrame([pi_vec], columns=fixed_order)
 
     return states_df, {"P": P_df, "pi": pi_df, "means": means_df, "init": tag_source, "n_used": int(len(g_fit))}
+
+
+if __name__ == "__main__":
+    # rough scaling check for the multi-season clustering path
+    for n in (2000, 6000, 12000):
+        print(benchmark_multi_season_clustering(n_rows=n))
@@ -2,29 +2,16 @@
 from power_rankings import *
 from table_rankings import *
 from io import StringIO
-
-def get_batting_stats(year=2025):
-    driver = get_webdriver()
-    url = f"https://www.baseball-reference.com/leagues/majors/{year}.shtml#all_teams_standard_batting"
-
-    # get the url and parse the table #teams_standard_batting
-    driver.get(url)
-    table = driver.find_element("css selector", "table#teams_standard_batting")
-    # read the html table into a pandas dataframe
-    html_str = table.get_attribute('outerHTML')
-    df = pd.read_html(StringIO(html_str))[0]
-    driver.quit()
-
-    # remove last 3 rows (totals, etc)
-    df = df.iloc[:-3]
-
-    # convert team names to team ids
-    df['team_name'] = df['Tm'].apply(lambda name: match_team(name, TEAMS))
-    # remove Tm column
-    df = df.drop(columns=['Tm'])
-
-    # rename columns to for better readability
-    df = df.rename(columns={
+import re
+import lxml.html
+from datasets import DATA_DIR, append_rows, stored_dates
+from response_cache import ttl_for_season
+from team_resolver import resolver_for
+
+# Baseball-Reference team tables on leagues/majors/{year}.shtml: table id + column renames
+# for better readability
+BBREF_TABLES = {
+    "batting": ("teams_standard_batting", {
         '#Bat': 'num_batters', # number of players used in games
         'BatAge': 'batting_age', # average age of batters
         'R/G': 'runs_per_game', # runs per game
@@ -53,31 +40,8 @@ def get_batting_stats(year=2025):
         'SF': 'sacrifice_flies', # sacrifice flies
         'IBB': 'intentional_base_on_balls', # intentional walks
         'LOB': 'left_on_base', # left on base
-    })
-    return df
-
-def get_pitching_stats(year=2025):
-    driver = get_webdriver()
-    url = f"https://www.baseball-reference.com/leagues/majors/{year}.shtml#all_teams_standard_pitching"
-
-    # get the url and parse the table #teams_standard_pitching
-    driver.get(url)
-    table = driver.find_element("css selector", "table#teams_standard_pitching")
-    # read the html table into a pandas dataframe
-    html_str = table.get_attribute('outerHTML')
-    df = pd.read_html(StringIO(html_str))[0]
-    driver.quit()
-
-    # remove last 3 rows (totals, etc)
-    df = df.iloc[:-3]
-
-    # convert team names to team ids
-    df['team_name'] = df['Tm'].apply(lambda name: match_team(name, TEAMS))
-    # remove Tm column
-    df = df.drop(columns=['Tm'])
-
-    # rename columns to for better readability
-    df = df.rename(columns={
+    }),
+    "pitching": ("teams_standard_pitching", {
         '#P': 'num_pitchers', # number of players used in games
         'PAge': 'pitching_age', # average age of pitchers
         'RA/G': 'runs_allowed_per_game', # runs allowed per game
@@ -113,32 +77,8 @@ def get_pitching_stats(year=2025):
         'SO9': 'strikeouts_per_nine_innings', # strikeouts per 9 innings
         'SO/W': 'strikeout_to_walk_ratio', # strikeout to walk ratio
         'LOB': 'left_on_base', # runners left on base
-    })
-
-    return df
-
-def get_fielding_stats(year=2025):
-    driver = get_webdriver()
-    url = f"https://www.baseball-reference.com/leagues/majors/{year}.shtml#all_teams_standard_fielding"
-
-    # get the url and parse the table #teams_standard_fielding
-    driver.get(url)
-    table = driver.find_element("css selector", "table#teams_standard_fielding")
-    # read the html table into a pandas dataframe
-    html_str = table.get_attribute('outerHTML')
-    df = pd.read_html(StringIO(html_str))[0]
-    driver.quit()
-
-    # remove last 3 rows (totals, etc)
-    df = df.iloc[:-3]
-
-    # convert team names to team ids
-    df['team_name'] = df['Tm'].apply(lambda name: match_team(name, TEAMS))
-    # remove Tm column
-    df = df.drop(columns=['Tm'])
-
-    # rename columns to for better readability
-    df = df.rename(columns={
+    }),
+    "fielding": ("teams_standard_fielding", {
         '#Fld': 'num_fielders', # number of players used in games
         'RA/G': 'runs_allowed_per_game', # runs allowed per game
         'G': 'games', # games played
@@ -156,5 +96,107 @@ def get_fielding_stats(year=2025):
         'Rdrs': 'defensive_runs_saved', # defensive runs saved
         'Rdrs/yr': 'defensive_runs_saved_per_year', # defensive runs
         'Rgood': 'good_plays', # good plays
-    })
-    return df
\ No newline at end of file
+    }),
+}
+
+# year -> {"batting": df, "pitching": df, "fielding": df}; one page load serves all three views
+_SEASON_STATS = {}
+
+# bbref ships most tables inside HTML comments and un-comments them with JavaScript
+_COMMENT_MARKERS = re.compile(r"<!--|-->")
+
+def _season_page_html(year, driver=None):
+    """HTML of the season page over plain HTTP, or the browser-rendered page when that fails."""
+    url = f"https://www.baseball-reference.com/leagues/majors/{year}.shtml"
+    html = fetch_html(url, ttl=ttl_for_season(year))
+    if html is None or "teams_standard_batting" not in html:
+        html = render_html(url, driver, ttl_for_season(year))
+    return _COMMENT_MARKERS.sub("", html)
+
+def _team_table(df, renames, teams):
+    # remove last 3 rows (totals, etc)
+    df = df.iloc[:-3]
+
+    # convert team names to team ids
+    df['team_name'] = df['Tm'].map(resolver_for(teams).resolve)
+    # remove Tm column
+    df = df.drop(columns=['Tm'])
+    return df.rename(columns=renames)
+
+def get_season_team_stats(year=2025, driver=None, refresh=False):
+    """
+    Batting, pitching and fielding team tables for `year` from a single load of the
+    Baseball-Reference season page: {"batting": df, "pitching": df, "fielding": df}.
+    The result is kept per year, so the get_*_stats views below share one fetch.
+    """
+    if refresh or year not in _SEASON_STATS:
+        tree = lxml.html.fromstring(_season_page_html(year, driver))
+        teams = get_teams_and_tms()[0]
+        tables = {}
+        for kind, (table_id, renames) in BBREF_TABLES.items():
+            found = tree.xpath(f"//table[@id='{table_id}']")
+            if not found:
+                raise ValueError(f"table #{table_id} not found on the {year} season page")
+            # read the html table into a pandas dataframe
+            html_str = lxml.html.tostring(found[0], encoding="unicode")
+            tables[kind] = _team_table(pd.read_html(StringIO(html_str))[0], renames, teams)
+        _SEASON_STATS[year] = tables
+    return {kind: df.copy() for kind, df in _SEASON_STATS[year].items()}
+
+def get_batting_stats(year=2025):
+    return get_season_team_stats(year)["batting"]
+
+def get_pitching_stats(year=2025):
+    return get_season_team_stats(year)["pitching"]
+
+def get_fielding_stats(year=2025):
+    return get_season_team_stats(year)["fielding"]
+
+# weekly datasets: name -> fetch(year, sundays) returning the rows of those Sundays
+WEEKLY_FETCHERS = {
+    "power": lambda year, sundays: sunday_power(year, sundays=sundays)[0],
+    "standings": lambda year, sundays: sunday_standings(year, sundays=sundays),
+    "odds": lambda year, sundays: sunday_odds(year, sundays=sundays),
+}
+
+def season_weeks(year=2025, data_dir=DATA_DIR, today=None):
+    """
+    Played Sundays of the season (up to `today`) that should have weekly rows: from the first
+    week any weekly dataset has stored (the Sundays before are spring training) on, and once the
+    season is over only up to its last stored week (the Sundays after are the postseason).
+    With nothing stored yet, every played Sunday.
+    """
+    sundays = season_sundays(year, today)
+    seen = set().union(*(stored_dates(name, year, data_dir) for name in WEEKLY_FETCHERS))
+    if not seen:
+        return sundays
+    now = pd.Timestamp.today() if today is None else pd.to_datetime(today)
+    last = max(seen) if now > pd.Timestamp(f"{year}-10-31") else now
+    return [d for d in sundays if min(seen) <= d <= last]
+
+def missing_sundays(name, year=2025, data_dir=DATA_DIR, today=None):
+    """
+    Weeks of season_weeks() with no rows in data/<name>_{year}.csv. Power rankings are dated by
+    their article and MLB.com skips some weeks (e.g. the All-Star break), so for power only the
+    weeks more than 3 days after the last stored article are missing.
+    """
+    have = stored_dates(name, year, data_dir)
+    weeks = season_weeks(year, data_dir, today)
+    if name == "power":
+        return [d for d in weeks if not have or d - pd.Timedelta(days=3) > max(have)]
+    return [d for d in weeks if d not in have]
+
+def refresh_weekly(name, year=2025, data_dir=DATA_DIR, full=False):
+    """
+    Bring data/<name>_{year}.csv up to date. Every week of the season that has no stored rows
+    is fetched (see missing_sundays; weeks that failed before are retried, and rows dated in
+    the future do not hide the weeks before them); with full=True, the whole season. The new rows
+    are appended, de-duplicated on the dataset keys and written back. Rows already stored keep
+    their values, so e.g. mlb_rank is only computed for the new dates.
+    Returns the combined frame with the compact schema.
+    """
+    sundays = season_sundays(year) if full else missing_sundays(name, year, data_dir)
+    if not sundays:
+        return append_rows(name, year, pd.DataFrame(), data_dir)
+    new = WEEKLY_FETCHERS[name](year, sundays)
+    return append_rows(name, year, new, data_dir)
@@ -1,16 +1,26 @@
 # power_rankings.py
 # Script to scrape MLB power rankings from MLB.com using Selenium and store them in a DataFrame
+# Selenium and tqdm are imported inside the functions that drive a browser, so importing
+# this module (e.g. for match_team) stays cheap for the web server.
+# Pages are first fetched over plain HTTP and parsed with lxml; the headless browser is only
+# started when a page turns out to need JavaScript, and its rendered HTML goes through the
+# same parsers and into the response cache.
+import atexit
 import os
 import shutil
-from selenium import webdriver
-from selenium.webdriver.edge.service import Service
-from selenium.webdriver.edge.options import Options
-from selenium.webdriver.common.by import By
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime, timedelta
+from urllib.parse import urljoin, urlparse
 import pandas as pd
-from tqdm import tqdm
-from selenium.webdriver.chrome.service import Service as ChromeService
-from selenium.webdriver.chrome.options import Options as ChromeOptions
+import response_cache
+from http_client import get_client
+from response_cache import FOREVER, RECENT_TTL
+from team_resolver import resolver_for
+
+MLB_BASE_URL = "https://www.mlb.com"
+FIXTURE_DIR = os.path.join("data", "fixtures")
 
 
 def get_webdriver():
@@ -18,6 +28,10 @@ def get_webdriver():
     Chrome-only, works locally and on Heroku when using the chrome-for-testing buildpack.
     The buildpack places 'chrome' and 'chromedriver' on PATH.
     """
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service as ChromeService
+    from selenium.webdriver.chrome.options import Options as ChromeOptions
+
     opts = ChromeOptions()
     opts.add_argument("--headless=new")
     opts.add_argument("--no-sandbox")
@@ -34,36 +48,257 @@ def get_webdriver():
 
     return webdriver.Chrome(service=service, options=opts)
 
-def get_all_articles(start_date, end_date, page, driver):
+class BrowserPool:
+    """
+    Every headless Chrome of the process: at most `size` run at once, and an idle one is reused
+    by whichever thread needs a browser next. lease() blocks while all of them are busy.
+    A browser is leased per page, never held across calls, so nested scrapes cannot deadlock.
+    """
+    def __init__(self, size=4, factory=None):
+        self.size = max(1, int(size))
+        self.factory = factory  # None: get_webdriver
+        self._idle = []
+        self._running = 0
+        self._cond = threading.Condition()
+
+    def resize(self, size):
+        with self._cond:
+            self.size = max(1, int(size))
+            self._cond.notify_all()
+
+    @property
+    def running(self):
+        return self._running
+
+    @contextmanager
+    def lease(self):
+        with self._cond:
+            while not self._idle and self._running >= self.size:
+                self._cond.wait()
+            driver = self._idle.pop() if self._idle else None
+            if driver is None:
+                self._running += 1
+        if driver is None:
+            try:
+                driver = (self.factory or get_webdriver)()
+            except BaseException:
+                self._retire(None)
+                raise
+        try:
+            yield driver
+        except BaseException:
+            self._retire(driver)  # the page may have left it in a bad state
+            raise
+        with self._cond:
+            self._idle.append(driver)
+            self._cond.notify()
+
+    def _retire(self, driver):
+        if driver is not None:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        with self._cond:
+            self._running -= 1
+            self._cond.notify()
+
+    def close_idle(self):
+        """Quit the browsers nobody is using (they are started again on demand)."""
+        with self._cond:
+            idle, self._idle = self._idle, []
+        for driver in idle:
+            self._retire(driver)
+
+# the per-process browser budget (backfill sets it to its --browsers share)
+BROWSERS = BrowserPool(int(os.environ.get("MLB_BROWSERS", 4)))
+atexit.register(BROWSERS.close_idle)
+
+class LazyWebDriver:
+    """
+    Handle for "a browser if a page needs one": it borrows one from BROWSERS for each page
+    (see _with_driver), so a scrape served entirely over plain HTTP never starts Chrome and
+    no caller can exceed the process's browser budget.
+    """
+    def __init__(self, pool=None):
+        self.pool = pool or BROWSERS
+        self.started = False
+
+    def run(self, fn):
+        self.started = True
+        with self.pool.lease() as driver:
+            return fn(driver)
+
+    def quit(self):
+        self.pool.close_idle()
+
+def _with_driver(driver, fn):
+    # run fn(driver) on the caller's own webdriver, else on one leased from the browser pool
+    if driver is None or isinstance(driver, LazyWebDriver):
+        return (driver or LazyWebDriver()).run(fn)
+    return fn(driver)
+
+# ---------- plain HTTP fast path ----------
+# per page kind, a hint only: (whether the last plain HTTP page parsed, when). After a page that
+# needed JavaScript, the next ones of that kind skip the network fetch for HTTP_RETRY seconds
+# (cached bodies are still used); every page still falls back to the browser on its own.
+_HTTP_WORKS = {"search": None, "article": None, "teams": None}
+HTTP_RETRY = 15 * 60  # seconds
+# how long a raw page stays in the response cache: published articles never change,
+# search results gain new articles every week
+PAGE_TTLS = {"search": RECENT_TTL, "article": FOREVER, "teams": 7 * 24 * RECENT_TTL}
+
+def fetch_html(url, ttl=0):
+    """
+    GET a page over plain HTTP (shared rate-limited client); the HTML text, or None on any
+    failure. ttl > 0 serves/stores it through the on-disk response cache.
+    """
+    return get_client(url).get_text(url, ttl=ttl)
+
+RENDERED = "<!-- rendered -->\n"  # marks a cached body as the browser's page, not the raw HTML
+
+def render_html(url, driver=None, ttl=0):
+    """
+    page_source of `url` after the browser ran its JavaScript. With ttl > 0 it is stored in the
+    response cache under the same key as the plain HTTP body, so later runs parse the rendered
+    page without a browser. Replay mode never starts one: a page that needs it raises CacheMiss.
+    """
+    host = urlparse(url).netloc
+    if response_cache.get_mode() == "replay":
+        raise response_cache.CacheMiss(f"{host}: {url} (rendered page not recorded)")
+    html = RENDERED + _with_driver(driver, lambda d: (d.get(url), d.page_source)[1])
+    if ttl:
+        response_cache.put(host, url, html)
+    return html
+
+def _http_parse(kind, url, parse):
+    """
+    Parse `url` fetched over plain HTTP. Returns the parsed items, or None when the caller
+    should render this page in the browser instead: the fetch failed, or nothing parseable
+    came back (the page needs JavaScript, or its HTML changed).
+    """
+    hint = _HTTP_WORKS[kind]
+    if hint is not None and not hint[0] and time.time() - hint[1] < HTTP_RETRY:
+        html = response_cache.get(urlparse(url).netloc, url, PAGE_TTLS[kind])
+    else:
+        html = fetch_html(url, ttl=PAGE_TTLS[kind])
+    items = parse(html) if html is not None else None
+    if html is not None and html.startswith(RENDERED):
+        return items  # the browser already rendered this page: empty really means empty
+    if items:
+        _HTTP_WORKS[kind] = (True, time.time())
+        return items
+    if html is not None:
+        _HTTP_WORKS[kind] = (False, time.time())
+    return None
+
+def _html_tree(html):
+    import lxml.html
+    return lxml.html.fromstring(html)
+
+def _text(el):
+    # whitespace-normalized like Selenium's WebElement.text
+    return " ".join(el.text_content().split())
+
+def _has_class(cls):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')"
+
+def parse_search_hits(html, base_url=MLB_BASE_URL):
+    """[(title, datetime attribute, absolute url)] for every hit on a search results page."""
+    hits = []
+    for link in _html_tree(html).xpath("//a[@data-testid='suggested-hit-container']"):
+        h3, time_el = link.xpath(".//h3"), link.xpath(".//time")
+        if not h3 or not time_el:
+            continue
+        hits.append((_text(h3[0]), time_el[0].get("datetime"), urljoin(base_url, link.get("href", ""))))
+    return hits
+
+def parse_article_strong_texts(html):
+    """Text of every <strong> inside div.markdown of the first <article> (the ranking lines)."""
+    articles = _html_tree(html).xpath("//article")
+    if not articles:
+        return []
+    return [_text(el) for el in articles[0].xpath(f".//div[{_has_class('markdown')}]//strong")]
+
+def parse_team_list(html):
+    """[(team_id, team_name)] from the div.p-forge-list-item blocks on mlb.com/team."""
+    pairs = []
+    for div in _html_tree(html).xpath(f"//div[{_has_class('p-forge-list-item')}]"):
+        h2 = div.xpath(".//h2")
+        if h2:
+            pairs.append((div.get("id"), _text(h2[0])))
+    return pairs
+
+def _hit_date(date):
+    # subtract a day and convert back to YYYY-MM-DD string
+    return (pd.to_datetime(date) - pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+
+def _filter_search_hits(hits, start_date, end_date):
     SEARCHSTART = start_date
     SEARCHEND = end_date
-    url = f"https://www.mlb.com/search?q=power+rankings&filter=news&page={page}"
-    driver.get(url)
-    articles = driver.find_elements(By.CSS_SELECTOR, "a[data-testid='suggested-hit-container']")
     results = []
-    for link in articles:
-        title = link.find_element(By.CSS_SELECTOR, "h3").text
-        date = link.find_element(By.CSS_SELECTOR, "time").get_attribute("datetime")
-        # subtract a day and convert back to YYYY-MM-DD string
-        date = (pd.to_datetime(date) - pd.Timedelta(days=1)).strftime("%Y-%m-%d")
-        link_url = link.get_attribute("href")
+    for title, date, link_url in hits:
+        date = _hit_date(date)
         if SEARCHSTART <= date <= SEARCHEND and "power rankings" in title.lower() and "hitter" not in title.lower() and "pitcher" not in title.lower():
             results.append((title, date, link_url))
     return results
 
-def get_all_articles_in_range(start_date, end_date, driver):
-    page = 1
+def _search_url(page):
+    return f"https://www.mlb.com/search?q=power+rankings&filter=news&page={page}"
+
+def get_search_hits(page, driver=None):
+    """Unfiltered [(title, datetime, url)] hits of one search results page."""
+    url = _search_url(page)
+    hits = _http_parse("search", url, parse_search_hits)
+    if hits is None:
+        hits = parse_search_hits(render_html(url, driver, PAGE_TTLS["search"]))
+    return hits
+
+def get_all_articles(start_date, end_date, page, driver=None):
+    return _filter_search_hits(get_search_hits(page, driver), start_date, end_date)
+
+def get_all_articles_in_range(start_date, end_date, driver=None, lookahead=3, max_pages=100):
+    """
+    Power rankings articles published in [start_date, end_date], newest first.
+
+    Search results are sorted newest first, so paging stops at the first page that is empty
+    or whose newest hit is already before start_date. Pages after the first are fetched
+    `lookahead` at a time on a ScrapePool; hits are de-duplicated by URL across pages.
+    """
+    from scrape_pool import ScrapePool
+    seen = set()
     all_results = []
-    while True:
-        results = get_all_articles(start_date, end_date, page, driver)
-        if not results:
-            break
-        all_results.extend(results)
-        page += 1
+
+    def consume(hits):
+        # returns False once paging should stop
+        if not hits:
+            return False
+        for title, date, url in _filter_search_hits(hits, start_date, end_date):
+            if url not in seen:
+                seen.add(url)
+                all_results.append((title, date, url))
+        return max(_hit_date(date) for _, date, _ in hits) >= start_date
+
+    # page 1 alone on the caller's driver: it sets the HTTP hint for search pages before
+    # several workers try at once
+    if not consume(get_search_hits(1, driver)):
+        return all_results
+    page = 2
+    with ScrapePool(size=lookahead, per_host=lookahead) as pool:
+        while page <= max_pages:
+            pages = list(range(page, min(page + lookahead, max_pages + 1)))
+            batch = pool.map(lambda p, drv: get_search_hits(p, drv), pages, url_of=_search_url)
+            for hits in batch:
+                if not consume(hits):
+                    return all_results
+            page += len(pages)
     return all_results
 
-def get_all_teams(driver):
-    driver.get("https://www.mlb.com/team")
+def get_all_teams(driver=None):
+    url = "https://www.mlb.com/team"
+    pairs = _http_parse("teams", url, parse_team_list)
+    if pairs is None:
+        pairs = parse_team_list(render_html(url, driver, PAGE_TTLS["teams"]))
     stsr = """
         Arizona Diamondbacks - ARI
 
@@ -125,13 +360,9 @@ def get_all_teams(driver):
 
         Washington Nationals - WAS
     """
-    # div class p-forge-list-item, team name in id as a hyphenated string and in h2 inside the div as text
-    team_elements = driver.find_elements(By.CSS_SELECTOR, "div.p-forge-list-item")
     teams = {}
     tms = {}
-    for team in team_elements:
-        team_name = team.find_element(By.TAG_NAME, "h2").text
-        team_id = team.get_attribute("id")
+    for team_id, team_name in pairs:
         # for team code, match the team name to the abbreviation in stsr
         for line in stsr.split("\n"):
             line = line.strip()
@@ -146,72 +377,101 @@ def get_all_teams(driver):
     return teams, tms
 
 def match_team(name, teams):
-    name = name.replace("'", "").replace(".", "").replace("’", "").replace("“", "").replace("”", "").replace('"', '').replace("`", "").replace("´", "").replace("–", "").replace("—", "").replace("-", "").strip()
-    if name == "As":
-        name = "Athletics"
-    if name == "Dbacks":
-        name = "Diamondbacks"
-    for team_id, team_name in teams.items():
-        team_name_clean = team_name.replace("'", "").replace(".", "").replace("’", "").replace("“", "").replace("”", "").replace('"', '').replace("`", "").replace("´", "").replace("–", "").replace("—", "").replace("-", "").strip()
-        if name.lower() in team_name_clean.lower() or team_name_clean.lower() in name.lower():
-            return team_id
-    return None
-def get_rankings_from_article(url, teams, driver):
-    driver.get(url)
-    # look for the first article tag
-    article = driver.find_element(By.CSS_SELECTOR, "article")
-    # Look for divs which have class 'markdown' as well as a strong tag inside them. Both need to be present inside the article tag
-    ranking_elements = article.find_elements(By.CSS_SELECTOR, "div.markdown strong")
+    """team_id for a scraped team name (see team_resolver.TeamResolver), or None."""
+    return resolver_for(teams).resolve(name)
+
+def rankings_from_strong_texts(ranking_elements, teams):
+    """[(rank, team_id)] from the <strong> texts of a power rankings article."""
+    resolver = resolver_for(teams)
     rankings = []
-    for i, elem in enumerate(ranking_elements):
+    for i, text in enumerate(ranking_elements):
         # get the rank. The string is of the form "{rank}. {team name}", so split on the first period
-        text = elem.text
         # if the text does not start with a number, skip it
-        if not text[0].isdigit():
+        if not text or not text[0].isdigit():
             continue
         rank, team_name = text.split(".", 1) # split on the first period
         # if length of team_name is 0 after stripping, take the next sibling
         if len(team_name.strip()) == 0:
-            team_name = ranking_elements[i + 1].text
+            team_name = ranking_elements[i + 1]
         rank = rank.strip()
         team_name = team_name.strip()
         # team name has additional text, so split on the first comma or parenthesis, take the first part and match that to the teams dict (word match, i.e. "Yankees" should match "New York Yankees")
         team_name = team_name.split(",")[0].split("(")[0].strip()
-        # fall back for Athletics -> A's
-        # remove punctuation from team_name
-        team_name = team_name.replace("'", "").replace(".", "").replace("’", "").replace("“", "").replace("”", "").replace('"', '').replace("`", "").replace("´", "").replace("–", "").replace("—", "").replace("-", "").strip()
-        if team_name == "As":
-            team_name = "Athletics"
-        if team_name == "Dbacks":
-            team_name = "Diamondbacks"
-        matched_team = None
-        for team_id, name in teams.items():
-            if team_name.lower() in name.lower() or name.lower() in team_name.lower():
-                matched_team = (rank, team_id)
-                break
+        # punctuation and nicknames (A's -> Athletics) are handled by the resolver
+        team_id = resolver.resolve(team_name)
+        matched_team = (rank, team_id) if team_id is not None else None
         if matched_team:
             rankings.append(matched_team)
     return rankings
 
-def rankings_wrapper(year):
-    driver = get_webdriver()
-    YEAR = 2025
-    SEARCHSTART = f"{YEAR-1}-11-01"
-    SEARCHEND = f"{YEAR}-10-31"
+def get_rankings_from_article(url, teams, driver=None):
+    texts = _http_parse("article", url, parse_article_strong_texts)
+    if texts is None:
+        texts = parse_article_strong_texts(render_html(url, driver, PAGE_TTLS["article"]))
+    return rankings_from_strong_texts(texts, teams)
+
+def rankings_wrapper(year, workers=4, sundays=None, checkpoint=True):
+    """
+    Scrape every power rankings article for the season. Articles are fetched in parallel
+    on a ScrapePool of `workers` threads; pages that need JavaScript borrow a browser from the
+    shared BROWSERS pool (BrowserPool).
+    With `sundays`, only the articles dated within 3 days of one of those Sundays are scraped.
+    With `checkpoint`, the article list, team list and every scraped article are saved as they
+    complete (checkpoint.Checkpoint), so a rerun after a failure resumes where it stopped.
+    """
+    from tqdm import tqdm
+    from checkpoint import Checkpoint
+    from scrape_pool import ScrapePool
 
     searchstart = f"{year-1}-11-01"
     searchend = f"{year}-10-31"
-    all_articles = get_all_articles_in_range(searchstart, searchend, driver)
-    all_teams, l_tms = get_all_teams(driver)
+    wanted = None
+    if sundays is not None:
+        # the article for a week is dated its Sunday; allow for one published a little off
+        wanted = {(pd.to_datetime(d) + pd.Timedelta(days=k)).strftime("%Y-%m-%d")
+                  for d in sundays for k in range(-3, 4)}
+        searchstart, searchend = min(wanted), max(wanted)
+    ckpt = Checkpoint(f"power_{year}_{searchstart}_{searchend}") if checkpoint else None
+
+    if ckpt is not None and "articles" in ckpt and "teams" in ckpt:
+        all_articles = [tuple(a) for a in ckpt.get("articles")]
+        all_teams, l_tms = ckpt.get("teams")
+    else:
+        driver = LazyWebDriver()  # Chrome starts only if some page needs JavaScript
+        try:
+            all_articles = get_all_articles_in_range(searchstart, searchend, driver)
+            all_teams, l_tms = get_all_teams(driver)
+        finally:
+            driver.quit()
+        if wanted is not None:
+            all_articles = [a for a in all_articles if a[1] in wanted]
+        if ckpt is not None:
+            ckpt.record("articles", all_articles)
+            ckpt.record("teams", [all_teams, l_tms])
     all_rankings = []
 
+    def scrape(article, drv):
+        url = article[2]
+        if ckpt is not None and url in ckpt:
+            return [tuple(r) for r in ckpt.get(url)]
+        rankings = get_rankings_from_article(url, all_teams, drv)
+        if ckpt is not None:
+            ckpt.record(url, rankings)
+        return rankings
+
     # Progress bar over articles
-    for title, date, url in tqdm(all_articles, desc="Scraping Power Rankings", unit="week"):
-        rankings = get_rankings_from_article(url, all_teams, driver)
+    with tqdm(total=len(all_articles), desc="Scraping Power Rankings", unit="week") as bar, \
+            ScrapePool(size=workers) as pool:
+        per_article = pool.map(
+            scrape,
+            all_articles,
+            url_of=lambda article: article[2],
+            on_done=lambda _article: bar.update(1),
+        )
+    for (title, date, url), rankings in zip(all_articles, per_article):
         for rank, team_id in rankings:
             all_rankings.append((date, team_id, rank, all_teams[team_id]))
 
-    driver.quit()
     df_r = pd.DataFrame(all_rankings, columns=["date", "team_id", "rank", "team"])
     df_r["date"] = pd.to_datetime(df_r["date"])
     df_r["rank"] = pd.to_numeric(df_r["rank"], errors="coerce").astype("Int64")
@@ -227,13 +487,57 @@ def rankings_wrapper(year):
     df_long = (df_r.merge(art, on="date", how="left")
                    [["date", "url", "team_id", "team", "rank"]]
                    .sort_values(["date", "rank"]))
-    
+    if ckpt is not None:
+        ckpt.clear()  # complete: the caller stores the result
     return df_long, all_teams, l_tms
 
-def sunday_power(year=2025): # nicer name
-    df, teams, tms = rankings_wrapper(year)
+def sunday_power(year=2025, workers=4, sundays=None): # nicer name
+    df, teams, tms = rankings_wrapper(year, workers=workers, sundays=sundays)
     return df, teams, tms
 
+# ---------- offline fixtures ----------
+def save_fixture(url, name, fixture_dir=FIXTURE_DIR, driver=None):
+    """
+    Save a page's HTML to <fixture_dir>/<name>.html so the parsers can be rerun offline.
+    Uses plain HTTP, or the browser-rendered page_source when HTTP fails.
+    """
+    html = fetch_html(url)
+    if html is None:
+        html = render_html(url, driver)
+    os.makedirs(fixture_dir, exist_ok=True)
+    path = os.path.join(fixture_dir, f"{name}.html")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(html)
+    return path
+
+def load_fixture(name, fixture_dir=FIXTURE_DIR):
+    with open(os.path.join(fixture_dir, f"{name}.html"), encoding="utf-8") as f:
+        return f.read()
+
+# fixture name prefix -> parser
+FIXTURE_PARSERS = {
+    "search": parse_search_hits,
+    "article": parse_article_strong_texts,
+    "teams": parse_team_list,
+}
+
+def benchmark_parsers(fixture_dir=FIXTURE_DIR, repeat=20):
+    """Parse every saved fixture `repeat` times; {fixture: (items parsed, ms per parse)}."""
+    out = {}
+    if not os.path.isdir(fixture_dir):
+        return out
+    for fname in sorted(os.listdir(fixture_dir)):
+        name, ext = os.path.splitext(fname)
+        parse = FIXTURE_PARSERS.get(name.split("_")[0])
+        if ext != ".html" or parse is None:
+            continue
+        html = load_fixture(name, fixture_dir)
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            items = parse(html)
+        out[name] = (len(items), round((time.perf_counter() - t0) / repeat * 1000, 2))
+    return out
+
 # TEST
 
 if __name__ == "__main__":
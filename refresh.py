@@ -0,0 +1,168 @@
+# refresh.py
+# Weekly data refresh. After each Sunday the incremental ingestion (mlb_rankings.refresh_weekly
+# for power/standings/odds, one bbref page load for the team stats) brings the season's files
+# up to date. Running web workers notice the new dataset version on disk (DatasetWatcher) and
+# hot-swap it in; see app.py.
+#
+# Either in-process (MLB_REFRESH=1; a file lock makes exactly one worker run it) or as a
+# companion worker on the same filesystem:
+#
+#   python refresh.py            # loop forever, refreshing every Monday 06:00 UTC
+#   python refresh.py --once     # refresh now and exit
+import argparse
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from datasets import DATA_DIR, SCHEMAS, dataset_path, write_dataset
+
+REFRESH_WEEKDAY = 0  # Monday: Sunday's games and articles are final
+REFRESH_HOUR = 6     # UTC
+WEEKLY = ("power", "standings", "odds")
+LOCK_FILE = ".refresh.lock"
+
+
+def next_refresh(now: datetime | None = None) -> datetime:
+    """The next Monday 06:00 UTC strictly after `now`."""
+    now = now or datetime.now(timezone.utc)
+    run = now.replace(hour=REFRESH_HOUR, minute=0, second=0, microsecond=0)
+    run += timedelta(days=(REFRESH_WEEKDAY - run.weekday()) % 7)
+    return run if run > now else run + timedelta(days=7)
+
+
+def current_season(now: datetime | None = None) -> int:
+    """The season being played (or, in January and February, the one just finished)."""
+    now = now or datetime.now(timezone.utc)
+    return now.year if now.month >= 3 else now.year - 1
+
+
+def in_season(day: datetime) -> bool:
+    """Regular season window used by the scrapers (Mar 1 - Oct 31), plus a week to catch up."""
+    return datetime(day.year, 3, 1, tzinfo=day.tzinfo) <= day <= datetime(day.year, 11, 7, tzinfo=day.tzinfo)
+
+
+def refresh_season(year: int, data_dir: str = DATA_DIR) -> dict:
+    """Bring every dataset of `year` up to date. Returns {dataset: rows or error message}."""
+    import table_rankings
+    from mlb_rankings import get_season_team_stats, refresh_weekly
+
+    result = {}
+    table_rankings.get_teams_and_tms()  # team names for the standings / odds resolvers
+    for name in WEEKLY:
+        try:
+            result[name] = len(refresh_weekly(name, year, data_dir))
+        except Exception as e:
+            result[name] = f"{type(e).__name__}: {e}"
+    try:
+        for name, df in get_season_team_stats(year, refresh=True).items():
+            result[name] = len(write_dataset(name, year, df, data_dir))
+    except Exception as e:
+        result["stats"] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def data_version(year: int, data_dir: str = DATA_DIR) -> tuple:
+    """Modification times of every stored dataset of `year`; changes whenever one is rewritten."""
+    paths = [dataset_path(name, year, data_dir) for name in SCHEMAS]
+    paths += [os.path.join(data_dir, f"teams_{year}.json"), os.path.join(data_dir, f"tms_{year}.json")]
+    return tuple(os.stat(p).st_mtime_ns if os.path.isfile(p) else 0 for p in paths)
+
+
+def _try_lock(data_dir: str):
+    """Non-blocking exclusive lock on data/.refresh.lock; the open file while held, else None."""
+    try:
+        import fcntl
+    except ImportError:  # no flock (Windows): single process assumed
+        return True
+    os.makedirs(data_dir, exist_ok=True)
+    f = open(os.path.join(data_dir, LOCK_FILE), "w")
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        f.close()
+        return None
+    return f
+
+
+class DatasetWatcher(threading.Thread):
+    """
+    Polls data_version(year) every `poll` seconds and calls on_change(year) when the files
+    change (the callback builds and swaps in the new state). check() runs one poll right away.
+    `year` is fixed (None: current_season() at each poll), not whichever season is being served.
+    """
+
+    def __init__(self, year, on_change, poll: float = 60.0, data_dir: str = DATA_DIR):
+        super().__init__(name="dataset-watcher", daemon=True)
+        self.year = year
+        self.on_change = on_change
+        self.poll = poll
+        self.data_dir = data_dir
+        self._seen = {}
+        self._lock = threading.Lock()
+
+    def check(self) -> bool:
+        year = self.year if self.year is not None else current_season()
+        version = data_version(year, self.data_dir)
+        with self._lock:
+            if year not in self._seen:
+                self._seen[year] = version  # what the worker loaded at startup
+                return False
+            if version == self._seen[year]:
+                return False
+            self._seen[year] = version
+        self.on_change(year)
+        return True
+
+    def run(self):
+        while True:
+            time.sleep(self.poll)
+            try:
+                self.check()
+            except Exception as e:  # keep watching; the next poll retries
+                print(f"dataset reload failed: {type(e).__name__}: {e}")
+
+
+class RefreshScheduler(threading.Thread):
+    """
+    Runs refresh_season(year) every Monday during the season, then on_refreshed(year).
+    `year` is fixed (None: the current_season() of each run).
+    """
+
+    def __init__(self, year=None, on_refreshed=None, data_dir: str = DATA_DIR):
+        super().__init__(name="refresh-scheduler", daemon=True)
+        self.year = year
+        self.on_refreshed = on_refreshed
+        self.data_dir = data_dir
+
+    def run(self):
+        lock = _try_lock(self.data_dir)
+        if lock is None:
+            return  # another worker on this machine owns the refresh
+        while True:
+            run_at = next_refresh()
+            time.sleep(max(0.0, (run_at - datetime.now(timezone.utc)).total_seconds()))
+            if not in_season(run_at):
+                continue
+            year = self.year if self.year is not None else current_season(run_at)
+            print(f"[refresh {year}] {refresh_season(year, self.data_dir)}")
+            if self.on_refreshed is not None:
+                self.on_refreshed(year)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Weekly incremental refresh of the MLB datasets.")
+    parser.add_argument("--year", type=int, default=None, help="season (default: the current one)")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--once", action="store_true", help="refresh now and exit")
+    args = parser.parse_args(argv)
+    if args.once:
+        print(refresh_season(args.year or current_season(), args.data_dir))
+        return
+    scheduler = RefreshScheduler(args.year, data_dir=args.data_dir)
+    scheduler.start()
+    scheduler.join()
+
+
+if __name__ == "__main__":
+    main()
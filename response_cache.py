@@ -0,0 +1,100 @@
+# response_cache.py
+# On-disk cache of raw ingestion responses (HTML / JSON text) under data/raw_cache/, keyed by
+# URL or by StatsAPI call + parameters. Data for past weeks and seasons is immutable, so those
+# entries never expire; anything still changing gets a short TTL.
+#
+# MLB_CACHE_MODE selects the behaviour:
+#   readwrite (default)  serve fresh entries, fetch and store misses
+#   replay               serve entries regardless of age and never touch the network; a miss
+#                        raises CacheMiss (offline reruns / parser benchmarks)
+#   off                  always fetch, store nothing
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+
+CACHE_DIR = os.path.join("data", "raw_cache")
+MODES = ("readwrite", "replay", "off")
+FOREVER = float("inf")
+RECENT_TTL = 60 * 60  # seconds, for responses that can still change
+
+_mode = os.environ.get("MLB_CACHE_MODE", "readwrite").lower()
+if _mode not in MODES:
+    _mode = "readwrite"
+
+
+class CacheMiss(LookupError):
+    """Replay mode asked for a response that was never recorded."""
+
+
+def get_mode() -> str:
+    return _mode
+
+
+def set_mode(mode: str) -> None:
+    global _mode
+    if mode not in MODES:
+        raise ValueError(f"cache mode must be one of {MODES}, got {mode!r}")
+    _mode = mode
+
+
+def ttl_for_date(day, recent: float = RECENT_TTL, settle_days: int = 2) -> float:
+    """FOREVER for a date more than `settle_days` in the past (its numbers are final), else `recent`."""
+    day = pd.to_datetime(day).date()
+    return FOREVER if day < date.today() - timedelta(days=settle_days) else recent
+
+
+def ttl_for_season(year: int, recent: float = 6 * RECENT_TTL) -> float:
+    """FOREVER once the season is over (after October), else `recent`."""
+    return FOREVER if datetime(int(year), 11, 1) < datetime.now() else recent
+
+
+def _path(namespace: str, key: str, cache_dir: str | None) -> str:
+    cache_dir = CACHE_DIR if cache_dir is None else cache_dir
+    digest = hashlib.sha256(key.encode()).hexdigest()
+    return os.path.join(cache_dir, namespace, digest[:2], f"{digest}.json")
+
+
+def get(namespace: str, key: str, ttl: float, cache_dir: str | None = None) -> str | None:
+    """Stored body for `key` if present and younger than `ttl` (any age in replay mode)."""
+    if _mode == "off":
+        return None
+    try:
+        with open(_path(namespace, key, cache_dir), encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if _mode != "replay" and time.time() - entry["stored_at"] > ttl:
+        return None
+    return entry["body"]
+
+
+def put(namespace: str, key: str, body: str, cache_dir: str | None = None) -> None:
+    if _mode != "readwrite":
+        return
+    path = _path(namespace, key, cache_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"key": key, "stored_at": time.time(), "body": body}, f)
+    os.replace(tmp, path)  # readers never see a half-written entry
+
+
+def fetch(namespace: str, key: str, load, ttl: float, cache_dir: str | None = None) -> str | None:
+    """
+    Cached body for `key`, else load() (a str, or None for a failed request, which is not
+    stored). In replay mode a missing entry raises CacheMiss instead of calling load().
+    """
+    body = get(namespace, key, ttl, cache_dir)
+    if body is not None:
+        return body
+    if _mode == "replay":
+        raise CacheMiss(f"{namespace}: {key}")
+    body = load()
+    if body is not None:
+        put(namespace, key, body, cache_dir)
+    return body
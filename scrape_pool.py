@@ -0,0 +1,72 @@
+# scrape_pool.py
+# Bounded pool for fetching many pages in parallel. Pages that need JavaScript borrow a browser
+# from the process-wide power_rankings.BROWSERS pool, one page at a time (a Selenium driver
+# serves one thread at a time), and a per-host semaphore caps how many requests hit the same
+# site at once.
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from power_rankings import LazyWebDriver
+
+
+class ScrapePool:
+    """
+    pool.map(fn, items, url_of) runs fn(item, driver) on `size` worker threads and returns
+    the results in input order. `driver` is the worker's LazyWebDriver, so Chrome is only
+    started for pages that need JavaScript, within the process's browser budget (`size`
+    threads do not mean `size` browsers). At most `per_host` tasks run
+    against the same host (taken from url_of(item)) at any time.
+    """
+
+    def __init__(self, size=4, per_host=4):
+        self.size = max(1, int(size))
+        self.per_host = max(1, int(per_host))
+        self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="scrape")
+        self._local = threading.local()
+        self._drivers = []
+        self._host_limits = {}
+        self._lock = threading.Lock()
+
+    def _driver(self):
+        driver = getattr(self._local, "driver", None)
+        if driver is None:
+            driver = self._local.driver = LazyWebDriver()
+            with self._lock:
+                self._drivers.append(driver)
+        return driver
+
+    def _host_limit(self, url):
+        host = urlparse(url).netloc if url else ""
+        with self._lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(self.per_host)
+            return self._host_limits[host]
+
+    def _run(self, fn, item, url, on_done):
+        with self._host_limit(url):
+            result = fn(item, self._driver())
+        if on_done is not None:
+            on_done(item)
+        return result
+
+    def map(self, fn, items, url_of=lambda item: item, on_done=None):
+        items = list(items)
+        futures = [self._executor.submit(self._run, fn, item, url_of(item), on_done) for item in items]
+        return [f.result() for f in futures]
+
+    @property
+    def browsers_started(self):
+        return sum(1 for d in self._drivers if d.started)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        if self._drivers:
+            self._drivers[0].quit()  # idle browsers of the shared pool
+        self._drivers.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
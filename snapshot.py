@@ -0,0 +1,141 @@
+# snapshot.py
+# Materialized analytics: every dashboard query that is a pure function of one season's
+# datasets (ranks, KDEs, volatility, stability/consistency, Granger, HMM states, similarity for
+# every team pair, clusters for k=2..10) is computed offline and stored as ready-to-send JSON
+# in data/analytics_<year>.json.gz, tagged with the version of the datasets it was built from.
+# app.py answers those requests from the snapshot while the version matches the served data
+# and computes live otherwise (new data, or a query outside the precomputed set).
+#
+#   python snapshot.py 2025
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+import time
+from itertools import permutations
+from urllib.parse import urlencode
+
+from datasets import DATA_DIR
+from memo import frame_fingerprint
+
+SNAPSHOT_FILE = "analytics_{year}.json.gz"  # under the data directory
+FORMAT = 2  # bump when the stored payloads or keys change shape
+
+ROUTES = ("/ranks", "/kdes", "/volatility", "/stability", "/consistency", "/granger",
+          "/similarity", "/clusters", "/hmm")
+SOURCES = ("power", "mlb")
+MODES = ("power", "mlb", "diff", "both")
+CLUSTER_KS = range(2, 11)
+# what the routes assume for a parameter a request leaves out (see app.py); request_key fills
+# these in, so the dashboard's bare /clusters and /clusters?k=6 are the same entry
+DEFAULTS = {
+    "/ranks": {"mode": "both"},
+    "/kdes": {"source": "power"},
+    "/volatility": {"source": "power"},
+    "/stability": {"source": "power", "max_lag": "4"},
+    "/consistency": {"source": "power", "max_lag": "4"},
+    "/granger": {"maxlag": "4"},
+    "/similarity": {"source": "power"},
+    "/clusters": {"k": "6"},
+}
+# the dashboard's similarity box starts on this pair (wwwroot/app.js) and also draws its ranks
+DASHBOARD_PAIR = ("NYY", "TOR")
+
+
+def snapshot_path(year: int, data_dir: str = DATA_DIR) -> str:
+    return os.path.join(data_dir, SNAPSHOT_FILE.format(year=year))
+
+
+def state_version(frames: dict, teams: dict, tms: dict) -> str:
+    """Content version of the datasets a snapshot is computed from."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(str(FORMAT).encode())
+    for name in sorted(frames):
+        h.update(f"{name}:{frame_fingerprint(frames[name])};".encode())
+    h.update(json.dumps([teams, tms], sort_keys=True).encode())
+    return h.hexdigest()
+
+
+def request_key(path: str, args) -> str:
+    """Canonical form of a request: path plus its query parameters with defaults filled in, sorted."""
+    items = list(args.items(multi=True) if hasattr(args, "getlist") else args)
+    given = {name for name, _ in items}
+    items += [(name, value) for name, value in DEFAULTS.get(path, {}).items() if name not in given]
+    return f"{path}?{urlencode(sorted(items))}"
+
+
+def snapshot_queries(codes) -> list:
+    """(path, params) for every query the snapshot answers, for team codes `codes`."""
+    codes = sorted(codes)
+    queries = []
+    for code in codes:
+        queries += [("/ranks", [("teams", code), ("mode", m)]) for m in MODES]
+        for src in SOURCES:
+            queries += [(path, [("teams", code), ("source", src)]) for path in ("/kdes", "/volatility")]
+            queries += [(path, [("team", code), ("source", src)]) for path in ("/stability", "/consistency")]
+        queries.append(("/granger", [("team", code)]))
+        queries.append(("/hmm", [("team", code)]))
+    for a, b in permutations(codes, 2):
+        queries += [("/similarity", [("team_a", a), ("team_b", b), ("source", src)]) for src in SOURCES]
+    if set(DASHBOARD_PAIR) <= set(codes):
+        queries += [("/ranks", [("teams", c) for c in DASHBOARD_PAIR] + [("mode", m)]) for m in MODES]
+    queries += [("/clusters", [("k", str(k))]) for k in CLUSTER_KS]
+    return queries
+
+
+def build(client, codes, version: str, year: int, data_dir: str = DATA_DIR) -> dict:
+    """
+    Request every snapshot query through `client` (a Flask test client) and store the
+    successful response bodies. Returns {"entries", "failed", "seconds": {path: s}}.
+    """
+    entries, failed, seconds = {}, [], {}
+    for path, params in snapshot_queries(codes):
+        t0 = time.perf_counter()
+        resp = client.get(f"{path}?{urlencode(params)}")
+        seconds[path] = seconds.get(path, 0.0) + time.perf_counter() - t0
+        if resp.status_code == 200:
+            entries[request_key(path, params)] = resp.get_data(as_text=True)
+        else:
+            failed.append(f"{path}?{urlencode(params)}: HTTP {resp.status_code}")
+    out = snapshot_path(year, data_dir)
+    tmp = f"{out}.{os.getpid()}.tmp"
+    with gzip.open(tmp, "wt", encoding="utf-8") as f:
+        json.dump({"format": FORMAT, "year": year, "version": version, "entries": entries}, f)
+    os.replace(tmp, out)
+    return {"entries": len(entries), "failed": failed,
+            "seconds": {p: round(s, 2) for p, s in seconds.items()}}
+
+
+def load(year: int, version: str, data_dir: str = DATA_DIR) -> dict | None:
+    """{request_key: JSON text} of the stored snapshot, or None if missing or built from other data."""
+    path = snapshot_path(year, data_dir)
+    if not os.path.isfile(path):
+        return None
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            snap = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if snap.get("format") != FORMAT or snap.get("version") != version:
+        return None
+    return snap["entries"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute the dashboard analytics of a season.")
+    parser.add_argument("year", type=int, nargs="?", default=2025)
+    args = parser.parse_args(argv)
+    import app
+    res = app.build_snapshot(args.year)
+    print(f"{res['entries']} entries -> {snapshot_path(args.year)}")
+    print("seconds per route:", res["seconds"])
+    if res["failed"]:  # queries that fail live too (e.g. too little data for a team)
+        print(f"{len(res['failed'])} failed:", *res["failed"][:20], sep="\n  ")
+    if not res["entries"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# sqlite_store.py
+# Optional embedded SQLite copy of the datasets (data/mlb.sqlite) for point queries: one table
+# per dataset with a `year` column, indexed on (year, team, date) and (year, date), so "last
+# standings row for TOR" or "all power ranks on a date" read a handful of rows instead of a
+# whole season. Enabled with MLB_SQLITE=1; the CSV/columnar files stay the source of truth and
+# a table is re-synced whenever its CSV changes.
+import os
+import sqlite3
+import threading
+from contextlib import closing
+
+import pandas as pd
+
+DB_FILE = "mlb.sqlite"  # under the data directory
+
+# column holding the team slug in each dataset (standings' own team_id is the numeric StatsAPI id)
+TEAM_COLS = {
+    "power": "team_id",
+    "standings": "team_name",
+    "odds": "team_name",
+    "batting": "team_name",
+    "pitching": "team_name",
+    "fielding": "team_name",
+}
+
+_LOCK = threading.Lock()  # one writer at a time within the process
+
+
+def enabled() -> bool:
+    return os.environ.get("MLB_SQLITE", "").lower() in ("1", "true", "yes")
+
+
+def connect(data_dir: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(os.path.join(data_dir, DB_FILE), timeout=30)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def _to_sql_frame(df: pd.DataFrame, year: int) -> pd.DataFrame:
+    out = df.copy()
+    for col in out.columns:
+        if pd.api.types.is_datetime64_any_dtype(out[col]):
+            out[col] = out[col].dt.strftime("%Y-%m-%d")  # ISO text sorts chronologically
+    out = out.astype(object).where(out.notna(), None)
+    out.insert(0, "year", int(year))
+    return out
+
+
+def sync(name: str, year: int, df: pd.DataFrame, source_mtime: float, data_dir: str) -> None:
+    """Replace the `year` rows of table `name` with `df` and (re)create its indexes."""
+    team = TEAM_COLS[name]
+    rows = _to_sql_frame(df, year)
+    with _LOCK, closing(connect(data_dir)) as conn, conn:
+        conn.execute("CREATE TABLE IF NOT EXISTS _synced (name TEXT, year INTEGER, mtime REAL, PRIMARY KEY (name, year))")
+        exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (name,)).fetchone()
+        if exists:
+            known = {r[1] for r in conn.execute(f'PRAGMA table_info("{name}")')}
+            if set(rows.columns) - known:  # the dataset gained columns: rebuild the table
+                conn.execute(f'DROP TABLE "{name}"')
+                conn.execute("DELETE FROM _synced WHERE name=?", (name,))
+            else:
+                conn.execute(f'DELETE FROM "{name}" WHERE year=?', (int(year),))
+        rows.to_sql(name, conn, if_exists="append", index=False)
+        has_date = "date" in rows.columns
+        conn.execute(f'CREATE INDEX IF NOT EXISTS "ix_{name}_team" ON "{name}" (year, "{team}"{", date" if has_date else ""})')
+        if has_date:
+            conn.execute(f'CREATE INDEX IF NOT EXISTS "ix_{name}_date" ON "{name}" (year, date)')
+        conn.execute("INSERT OR REPLACE INTO _synced VALUES (?, ?, ?)", (name, int(year), source_mtime))
+
+
+def synced_mtime(name: str, year: int, data_dir: str) -> float | None:
+    if not os.path.isfile(os.path.join(data_dir, DB_FILE)):
+        return None
+    with closing(connect(data_dir)) as conn:
+        try:
+            row = conn.execute("SELECT mtime FROM _synced WHERE name=? AND year=?", (name, int(year))).fetchone()
+        except sqlite3.OperationalError:
+            return None
+    return row[0] if row else None
+
+
+def query(sql: str, params: tuple, data_dir: str) -> list:
+    with closing(connect(data_dir)) as conn:
+        return [dict(r) for r in conn.execute(sql, params)]
+
+
+def team_rows(name: str, year: int, team: str, data_dir: str, last: bool = False) -> list:
+    """Rows of one team for a season (oldest first), or only its latest row with last=True."""
+    team_col = TEAM_COLS[name]
+    if name in ("batting", "pitching", "fielding"):  # season totals, no date
+        order = " LIMIT 1" if last else ""
+    else:
+        order = " ORDER BY date DESC LIMIT 1" if last else " ORDER BY date"
+    return query(f'SELECT * FROM "{name}" WHERE year=? AND "{team_col}"=?{order}', (int(year), team), data_dir)
+
+
+def date_rows(name: str, year: int, date: str, data_dir: str) -> list:
+    """All rows of a season on one date."""
+    return query(f'SELECT * FROM "{name}" WHERE year=? AND date=?', (int(year), date), data_dir)
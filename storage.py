@@ -0,0 +1,52 @@
+# storage.py
+# Columnar copies of the datasets: one uncompressed Feather (Arrow IPC) file per dataset and
+# season under data/columnar/<name>/year=<year>.feather. Types survive the round trip
+# (categoricals, nullable ints, floats, datetimes), so a load is a memory-mapped read plus
+# one Arrow-to-pandas conversion (which copies the columns) instead of a CSV parse + re-typing. pyarrow is optional; without it everything stays on CSV.
+import importlib.util
+import os
+import threading
+
+import pandas as pd
+
+COLUMNAR_DIR = "columnar"  # under the data directory
+
+
+def available() -> bool:
+    """True if pyarrow is installed (checked without importing it)."""
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def partition_path(name: str, year: int, data_dir: str) -> str:
+    return os.path.join(data_dir, COLUMNAR_DIR, name, f"year={year}.feather")
+
+
+def write_frame(df: pd.DataFrame, path: str) -> None:
+    """Write `df` as uncompressed Feather (memory-mappable), atomically."""
+    import pyarrow.feather as feather
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    feather.write_feather(df.reset_index(drop=True), tmp, compression="uncompressed")
+    os.replace(tmp, path)
+
+
+def read_frame(path: str, columns: list | None = None) -> pd.DataFrame:
+    """Read a Feather file (optionally only `columns`); the pandas frame is a copy, not the mapping."""
+    import pyarrow.feather as feather
+    table = feather.read_table(path, columns=columns, memory_map=True)
+    return table.to_pandas()
+
+
+def is_fresh(path: str, source: str) -> bool:
+    """The columnar file exists and is at least as new as the CSV it was built from (which must exist)."""
+    if not os.path.isfile(path) or not os.path.isfile(source):
+        return False
+    return os.path.getmtime(path) >= os.path.getmtime(source)
+
+
+def remove(path: str) -> None:
+    """Delete a partition whose CSV is gone, so it is never served again."""
+    try:
+        os.remove(path)
+    except OSError:
+        pass  # already gone, or a read-only data dir (is_fresh keeps ignoring it)
@@ -1,14 +1,15 @@
-import statsapi, pandas as pd
-from datetime import timedelta
-import requests
+import pandas as pd
 import json
 import os
 import time
-from tqdm import tqdm
-from selenium import webdriver
-from selenium.webdriver.edge.service import Service
-from selenium.webdriver.edge.options import Options
-from power_rankings import get_all_teams, match_team, get_webdriver
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+from http_client import TokenBucket, call_with_retries, get_client
+import response_cache
+from power_rankings import get_all_teams, match_team, get_webdriver, LazyWebDriver
+from team_resolver import resolver_for
+# statsapi / tqdm are imported inside the ingestion functions (slow imports, not needed to serve data)
 
 # Usage:
 TEAMS = None
@@ -17,7 +18,7 @@ TMS = None
 def get_teams_and_tms():
     global TEAMS, TMS
     if TEAMS is None or TMS is None:
-        driver = get_webdriver()
+        driver = LazyWebDriver()  # only starts Chrome if mlb.com/team needs JavaScript
         try:
             TEAMS, TMS = get_all_teams(driver)
         finally:
@@ -38,56 +39,135 @@ def sunday_range(start="2025-03-01", end="2025-10-31"):
         return []
     return list(pd.date_range(first_sun, end_d, freq="W-SUN"))
 
-def sunday_standings(year=2025):
+def season_sundays(year, today=None):
+    """Sundays of the season (Mar 1 - Oct 31) that are already played, up to `today` (default: now)."""
+    today = pd.Timestamp.today() if today is None else pd.to_datetime(today)
+    end = min(pd.Timestamp(f"{year}-10-31"), today.normalize())
+    return sunday_range(f"{year}-03-01", end)
+
+class StandingsStandIn:
+    """
+    Offline stand-in for the statsapi module: standings_data() answers from a stored standings
+    frame (data/standings_{year}.csv) in the shape StatsAPI returns. `latency` seconds per call
+    and `fail_every` (every n-th call raises) simulate the real service.
+    """
+
+    def __init__(self, standings, team_names=None, latency=0.0, fail_every=0):
+        self.standings = standings.assign(date=pd.to_datetime(standings["date"]).dt.normalize())
+        self.team_names = team_names or {}
+        self.latency = latency
+        self.fail_every = fail_every
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def standings_data(self, leagueId, season, date, standingsTypes=None):
+        with self._lock:
+            self.calls += 1
+            fail = self.fail_every and self.calls % self.fail_every == 0
+        time.sleep(self.latency)
+        if fail:
+            raise ConnectionError("simulated StatsAPI failure")
+        day = pd.to_datetime(date, format="%m/%d/%Y")
+        sub = self.standings[(self.standings["date"] == day) & (self.standings["league_id"].astype(int) == int(leagueId))]
+        teams = [{
+            "name": self.team_names.get(r["team_name"], r["team_name"]),
+            "team_id": r["team_id"], "w": r["wins"], "l": r["losses"],
+            "div_rank": r["division_rank"], "league_rank": r["league_rank"], "sport_rank": r["sport_rank"],
+            "gb": r["games_back"], "wc_rank": r["wc_rank"], "wc_gb": r["wc_gb"],
+            "wc_elim_num": r["wc_elim_num"], "elim_num": r["elim_num"],
+        } for _, r in sub.iterrows()]
+        return {int(leagueId): {"div_name": "all", "teams": teams}} if teams else {}
+
+def fetch_standings_data(tasks, client=None, workers=8, rate=10.0, retries=3, backoff=0.5, on_done=None):
+    """
+    standings_data() for every (sunday, league_id) in `tasks` on a pool of `workers` threads,
+    at most `rate` calls per second, retrying failures with exponential backoff.
+    Returns the responses in task order; a task that still fails after the retries gives None.
+    """
+    # real StatsAPI responses go through the on-disk response cache; stand-ins are not recorded
+    cached = client is None
+    if client is None:
+        import statsapi as client
+    limiter = TokenBucket(rate) if rate else None
+
+    def call(d, lg):
+        params = {
+            "leagueId": lg,
+            "season": d.year,
+            "date": pd.to_datetime(d).strftime("%m/%d/%Y"),
+            "standingsTypes": "regularSeason",
+        }
+        load = lambda: call_with_retries(lambda: client.standings_data(**params),
+                                         retries=retries, backoff=backoff, limiter=limiter)
+        if not cached:
+            return load()
+        key = "standings_data?" + urlencode(sorted(params.items()))
+        body = response_cache.fetch("statsapi", key, lambda: json.dumps(load()), response_cache.ttl_for_date(d))
+        return json.loads(body)
+
+    def fetch(task):
+        try:
+            return call(*task)
+        except response_cache.CacheMiss:
+            raise  # replay mode must not fall through to the network or skip silently
+        except Exception:
+            return None
+        finally:
+            if on_done is not None:
+                on_done(task)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        return list(pool.map(fetch, tasks))
+
+def sunday_standings(year=2025, sundays=None, client=None, workers=8, rate=10.0):
     """
     Pull standings snapshots for AL (103) and NL (104) on every Sunday.
     Uses date=MM/DD/YYYY and season=int to avoid the StatsAPI date/season bug.
     Returns a tidy DataFrame with one row per team per Sunday.
+    With `sundays`, only those dates are fetched (default: every played Sunday of the season).
+    The StatsAPI calls run concurrently (see fetch_standings_data); `client` replaces the
+    statsapi module, e.g. with a StandingsStandIn for offline runs.
     """
-    start=f"{year}-03-01"
-    end=f"{year}-10-31"
+    from tqdm import tqdm
     leagues = ["103", "104"]
-    sundays = sunday_range(start, end)
+    sundays = season_sundays(year) if sundays is None else [pd.to_datetime(d) for d in sundays]
+    tasks = [(d, lg) for d in sundays for lg in leagues]
     rows = []
 
-    for d in tqdm(sundays, desc="Importing weekly standings", unit="week"):
-        # Display progress bar
-        season = d.year
-        date_str = pd.to_datetime(d).strftime("%m/%d/%Y")
-        for lg in leagues:
-            try:
-                data = statsapi.standings_data(
-                    leagueId=lg,
-                    season=season,
-                    date=date_str,
-                    standingsTypes="regularSeason",
-                )
-            except Exception:
-                # If StatsAPI hiccups or date not valid yet, just skip this league/date
-                continue
-            if not isinstance(data, dict) or not data:
-                continue
-
-            # Each value is a division blob with a 'teams' list of flat dicts (as you printed)
-            for div_blob in data.values():
-                for t in div_blob.get("teams", []):
-                    rows.append({
-                        "date": pd.to_datetime(d).normalize(),
-                        "league_id": lg,
-                        "team_id": t.get("team_id"),
-                        "team_name": match_team(t.get("name"), TEAMS),
-                        "wins": t.get("w"),
-                        "losses": t.get("l"),
-                        "winning_pct": t.get("w")/max(t.get("w") + t.get("l"),1),
-                        "division_rank": t.get("div_rank"),
-                        "league_rank": t.get("league_rank"),
-                        "sport_rank": t.get("sport_rank"),
-                        "games_back": t.get("gb"),
-                        "wc_rank": t.get("wc_rank"),
-                        "wc_gb": t.get("wc_gb"),
-                        "wc_elim_num": t.get("wc_elim_num"),
-                        "elim_num": t.get("elim_num"),
-                    })
+    # Display progress bar
+    with tqdm(total=len(tasks), desc="Importing weekly standings", unit="call") as bar:
+        responses = fetch_standings_data(tasks, client=client, workers=workers, rate=rate,
+                                         on_done=lambda _task: bar.update(1))
+    failed = [(d.strftime("%Y-%m-%d"), lg) for (d, lg), data in zip(tasks, responses) if data is None]
+    if failed:
+        # If StatsAPI hiccups or date not valid yet, just skip this league/date
+        print(f"StatsAPI standings unavailable for {len(failed)} league/date pairs: {failed}")
+
+    resolve_team = resolver_for(TEAMS).resolve  # alias index built once for the season
+    for (d, lg), data in zip(tasks, responses):
+        if not isinstance(data, dict) or not data:
+            continue
+
+        # Each value is a division blob with a 'teams' list of flat dicts (as you printed)
+        for div_blob in data.values():
+            for t in div_blob.get("teams", []):
+                rows.append({
+                    "date": pd.to_datetime(d).normalize(),
+                    "league_id": lg,
+                    "team_id": t.get("team_id"),
+                    "team_name": resolve_team(t.get("name")),
+                    "wins": t.get("w"),
+                    "losses": t.get("l"),
+                    "winning_pct": t.get("w")/max(t.get("w") + t.get("l"),1),
+                    "division_rank": t.get("div_rank"),
+                    "league_rank": t.get("league_rank"),
+                    "sport_rank": t.get("sport_rank"),
+                    "games_back": t.get("gb"),
+                    "wc_rank": t.get("wc_rank"),
+                    "wc_gb": t.get("wc_gb"),
+                    "wc_elim_num": t.get("wc_elim_num"),
+                    "elim_num": t.get("elim_num"),
+                })
 
     df = pd.DataFrame(rows)
 
@@ -114,23 +194,47 @@ def sunday_standings(year=2025):
 
     return df
 
-def sunday_odds(year = 2025):
+def sunday_odds(year = 2025, sundays=None, workers=4, checkpoint=True):
     """
-    Pull Fangraphs playoff odds for every Sunday in the given year.
+    Pull Fangraphs playoff odds for every Sunday in the given year
+    (only the dates in `sundays`, when given). Weeks are fetched concurrently through the
+    shared Fangraphs client, which enforces the rate limit, timeouts and retries.
+    With `checkpoint`, each fetched week is saved as it arrives; a rerun only fetches the
+    weeks that are still missing.
     """
-    start=f"{year}-03-01"
-    end=f"{year}-10-31"
-    sundays = sunday_range(start, end)
-    rows = []
-    for d in tqdm(sundays, desc="Importing weekly odds", unit="week"):
+    from tqdm import tqdm
+    from checkpoint import Checkpoint
+    sundays = season_sundays(year) if sundays is None else [pd.to_datetime(d) for d in sundays]
+    client = get_client("www.fangraphs.com")
+    ckpt = Checkpoint(f"odds_{year}") if checkpoint else None
+
+    def fetch(d):
         current = pd.to_datetime(d).strftime("%Y-%m-%d")
+        if ckpt is not None and current in ckpt:
+            return ckpt.get(current)
         url = f"https://www.fangraphs.com/api/playoff-odds/odds?dateEnd={current}&dateDelta=&projectionMode=2&standingsType=mlb"
-        json = requests.get(url).json()
+        blob = client.get_json(url, ttl=response_cache.ttl_for_date(d))
+        if ckpt is not None and blob is not None:
+            ckpt.record(current, blob)
+        return blob
 
-        if not json:
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        blobs = list(tqdm(pool.map(fetch, sundays), total=len(sundays), desc="Importing weekly odds", unit="week"))
+    if ckpt is not None:
+        missing = [d.strftime("%Y-%m-%d") for d, blob in zip(sundays, blobs) if blob is None]
+        if missing:
+            # keep the checkpoint so a rerun only retries these weeks
+            print(f"Fangraphs odds unavailable for {len(missing)} week(s): {missing}")
+        else:
+            ckpt.clear()
+
+    rows = []
+    resolve_team = resolver_for(TEAMS).resolve  # alias index built once for the season
+    for d, blob in zip(sundays, blobs):
+        if not blob:
             continue
 
-        # each element in json is a team blob. We want 
+        # each element in blob is a team blob. We want 
         # Team name - shortName, 
         # Expected wins - endData.ExpW, 
         # Expected losses - endData.ExpL, 
@@ -143,11 +247,11 @@ def sunday_odds(year = 2025):
         # Clinch wild card - endData.wcTitle
         # Clinch bye - endData.div2Title
         # Win division - endData.divTitle
-        for team in json:
+        for team in blob:
             ed = team.get("endData", {})
             rows.append({
                 "date": pd.to_datetime(d).normalize(),
-                "team_name": match_team(team.get("shortName"), TEAMS),
+                "team_name": resolve_team(team.get("shortName")),
                 "expected_wins": ed.get("ExpW"),
                 "expected_losses": ed.get("ExpL"),
                 "ros_wins": ed.get("rosW"),
@@ -160,7 +264,6 @@ def sunday_odds(year = 2025):
                 "clinch_bye_odds": ed.get("div2Title"),
                 "win_division_odds": ed.get("divTitle"),
             })
-        time.sleep(0.2)  # be nice to Fangraphs servers
     df = pd.DataFrame(rows)
     if not df.empty:
         # Coerce numericish columns
@@ -0,0 +1,74 @@
+# team_resolver.py
+# Team-name -> team_id resolution for the scrapers. match_team used to re-clean every team
+# name for every row it matched; a TeamResolver cleans the season's team names once, seeds an
+# alias index (ids, full names, single words and word runs of each name, nicknames) and
+# memoizes every other lookup, with exactly the same answers as the original linear scan.
+import threading
+
+# punctuation dropped before comparing names
+_PUNCTUATION = str.maketrans("", "", "'.’“”\"`´–—-")
+# nicknames used by MLB.com / Fangraphs that aren't substrings of the full name
+NICKNAMES = {"As": "Athletics", "Dbacks": "Diamondbacks"}
+
+
+def clean_team_name(name: str) -> str:
+    """Strip punctuation/dashes and map nicknames ("A's" -> "Athletics")."""
+    name = name.translate(_PUNCTUATION).strip()
+    return NICKNAMES.get(name, name)
+
+
+class TeamResolver:
+    """
+    resolve(name) -> team_id of the first team (in `teams` order) whose cleaned name contains
+    the cleaned `name` or is contained in it, else None.
+    """
+
+    def __init__(self, teams: dict):
+        self.teams = dict(teams)
+        self._names = [(team_id, team_name.translate(_PUNCTUATION).strip().lower())
+                       for team_id, team_name in self.teams.items()]
+        self._lock = threading.Lock()
+        self._index = {}
+        for alias in self._aliases():
+            self._index[alias] = self._scan(alias)
+
+    def _aliases(self):
+        for team_id, team_name in self.teams.items():
+            yield clean_team_name(str(team_id)).lower()
+            words = team_name.translate(_PUNCTUATION).strip().lower().split()
+            for i in range(len(words)):
+                for j in range(i + 1, len(words) + 1):
+                    yield " ".join(words[i:j])
+        for nickname in NICKNAMES.values():
+            yield nickname.lower()
+
+    def _scan(self, key: str):
+        for team_id, team_name in self._names:
+            if key in team_name or team_name in key:
+                return team_id
+        return None
+
+    def resolve(self, name: str):
+        key = clean_team_name(name).lower()
+        try:
+            return self._index[key]
+        except KeyError:
+            team_id = self._scan(key)
+            with self._lock:
+                self._index[key] = team_id
+            return team_id
+
+
+_RESOLVERS = {}
+_RESOLVERS_LOCK = threading.Lock()
+
+
+def resolver_for(teams: dict) -> TeamResolver:
+    """The TeamResolver for a {team_id: team_name} mapping, built once per distinct mapping."""
+    key = tuple(teams.items())
+    resolver = _RESOLVERS.get(key)
+    if resolver is None:
+        resolver = TeamResolver(teams)
+        with _RESOLVERS_LOCK:
+            _RESOLVERS[key] = resolver
+    return resolver
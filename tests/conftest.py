@@ -0,0 +1,28 @@
+# Shared fixtures. The app reads data/ relative to the working directory, so the tests run
+# from the repository root.
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(autouse=True)
+def _repo_root(monkeypatch):
+    monkeypatch.chdir(ROOT)
+
+
+@pytest.fixture
+def app_module(monkeypatch):
+    """app.py with an empty STATE, as on a freshly started worker."""
+    import app
+    monkeypatch.setattr(app, "STATE", app.DataState())
+    monkeypatch.setattr(app, "_PRELOADED", {})
+    return app
+
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
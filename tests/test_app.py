@@ -0,0 +1,108 @@
+import pandas as pd
+
+
+def test_team_code_filter_on_fresh_worker(client):
+    r = client.get("/standings?teams=TOR&fields=mlb_rank")
+    assert r.status_code == 200
+    rows = r.get_json()["standings"]
+    assert rows and all(set(row) == {"mlb_rank"} for row in rows)
+
+
+def test_power_team_code_on_fresh_worker(client):
+    rows = client.get("/power?teams=TOR").get_json()["power"]
+    assert rows and {row["team_id"] for row in rows} == {"toronto-bluejays"}
+
+
+def test_team_last_code_on_fresh_worker(client):
+    row = client.get("/team_last?dataset=standings&team=TOR").get_json()["row"]
+    assert row is not None and row["team_name"] == "toronto-bluejays"
+
+
+def test_team_slug_still_accepted(client):
+    rows = client.get("/team_series?dataset=standings&team=toronto-bluejays").get_json()["rows"]
+    assert rows
+
+
+def test_unknown_team_is_400(client):
+    for url in ("/standings?teams=XXX", "/team_last?dataset=standings&team=XXX",
+                "/team_series?team=nope"):
+        r = client.get(url)
+        assert r.status_code == 400, url
+        assert "unknown team" in r.get_json()["error"]
+
+
+def test_date_rows(client):
+    rows = client.get("/date_rows?dataset=power&date=2025-06-15").get_json()["rows"]
+    assert len(rows) == 30 and {r["date"] for r in rows} == {"2025-06-15"}
+
+
+def test_date_rows_bad_input_is_400(client, monkeypatch):
+    for sqlite in ("", "1"):
+        monkeypatch.setenv("MLB_SQLITE", sqlite)
+        for url in ("/date_rows?dataset=power&date=bogus",
+                    "/date_rows?dataset=batting&date=2025-06-15",
+                    "/date_rows?dataset=power&date=2025-06-15&year=abc",
+                    "/team_last?dataset=standings&team=TOR&year=abc"):
+            r = client.get(url)
+            assert r.status_code == 400, (sqlite, url)
+            assert "error" in r.get_json()
+
+
+def test_bad_year_is_400(client):
+    for url in ("/changes?year=abc", "/changes?since=x", "/power?year=abc",
+                "/standings?year=abc&teams=TOR", "/odds?year=2o25&fields=ros_wins"):
+        r = client.get(url)
+        assert r.status_code == 400, url
+        assert "error" in r.get_json()
+
+
+def test_power_features_extend_appended_week(app_module, monkeypatch):
+    from datasets import load_dataset
+    from mlb_analytics import prepare_power_features_for_hmm
+    power = load_dataset("power", 2025)
+    last = power["date"].max()
+    monkeypatch.setattr(app_module, "POWERX", (None, pd.DataFrame(), pd.DataFrame()))
+    app_module._power_features(power[power["date"] < last].reset_index(drop=True))
+    calls = []
+    real = app_module.prepare_power_features_for_hmm
+    monkeypatch.setattr(app_module, "prepare_power_features_for_hmm", lambda p: calls.append(p) or real(p))
+    got = app_module._power_features(power)
+    assert calls == []  # the new week was appended, not rebuilt
+    want = prepare_power_features_for_hmm(power)
+    pd.testing.assert_frame_equal(got.sort_values(["team", "date"]).reset_index(drop=True)[want.columns],
+                                  want.sort_values(["team", "date"]).reset_index(drop=True), check_dtype=False)
+    assert app_module.POWERX[2] is got
+
+
+def test_ready_before_and_after_preload(app_module, client, monkeypatch):
+    monkeypatch.setattr(app_module, "READY", dict(app_module.READY, status="lazy", errors=[]))
+    r = client.get("/ready")
+    assert r.status_code == 200 and r.get_json()["status"] == "lazy"
+
+    during = []
+    load_states = app_module.load_states
+
+    def probed(*args, **kwargs):
+        during.append(client.get("/ready").status_code)
+        return load_states(*args, **kwargs)
+
+    monkeypatch.setattr(app_module, "load_states", probed)
+    app_module.preload([2025], workers=2)
+    assert during == [503]
+    body = client.get("/ready").get_json()
+    assert body["ready"] and body["status"] == "ready"
+    assert body["loaded"] == body["total"] > 0 and body["errors"] == []
+    assert app_module.STATE.year == 2025 and not app_module.STATE.power.empty
+
+
+def test_ready_reports_failed_preload(app_module, client, monkeypatch):
+    monkeypatch.setattr(app_module, "READY", dict(app_module.READY, status="lazy", errors=[]))
+
+    def broken(*args, **kwargs):
+        raise OSError("disk gone")
+
+    monkeypatch.setattr(app_module, "load_states", broken)
+    app_module.preload([2025])
+    r = client.get("/ready")
+    assert r.status_code == 503 and r.get_json()["status"] == "failed"
+    assert "disk gone" in r.get_json()["errors"][0]
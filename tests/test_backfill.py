@@ -0,0 +1,43 @@
+import shutil
+
+import pandas as pd
+import pytest
+
+import backfill
+from mlb_rankings import missing_sundays
+
+FILES = ("power_rankings", "standings", "odds", "batting_stats", "pitching_stats", "fielding_stats")
+
+
+@pytest.fixture
+def season(tmp_path):
+    for name in FILES:
+        shutil.copyfile(f"data/{name}_2025.csv", tmp_path / f"{name}_2025.csv")
+    shutil.copyfile("data/teams_2025.json", tmp_path / "teams_2025.json")
+    return tmp_path
+
+
+def _drop(path, column, value):
+    df = pd.read_csv(path)
+    df[df[column] != value].to_csv(path, index=False)
+
+
+def test_stored_season_coverage(season):
+    assert backfill.source_complete("stats", 2025, str(season))
+    assert backfill.source_complete("power", 2025, str(season))
+    # the stored standings follow the power weeks; the weeks without an article are missing
+    missing = missing_sundays("standings", 2025, str(season))
+    assert pd.Timestamp("2025-07-20") in missing
+    assert not backfill.source_complete("standings", 2025, str(season))
+
+
+def test_missing_week_is_incomplete(season):
+    _drop(season / "odds_2025.csv", "date", "2025-07-06")
+    assert pd.Timestamp("2025-07-06") in missing_sundays("odds", 2025, str(season))
+    _drop(season / "power_rankings_2025.csv", "date", "2025-09-28")
+    assert not backfill.source_complete("power", 2025, str(season))
+
+
+def test_missing_team_is_incomplete(season):
+    _drop(season / "pitching_stats_2025.csv", "team_name", "toronto-bluejays")
+    assert not backfill.source_complete("stats", 2025, str(season))
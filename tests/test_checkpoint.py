@@ -0,0 +1,44 @@
+import json
+
+import checkpoint
+import table_rankings
+from checkpoint import Checkpoint
+from http_client import get_client
+
+SUNDAYS = ["2025-06-01", "2025-06-08", "2025-06-15", "2025-06-22"]
+
+
+def _blob(wins):
+    return [{"shortName": "Blue Jays", "endData": {"ExpW": wins, "ExpL": 162 - wins}}]
+
+
+def test_torn_last_line_is_ignored(tmp_path):
+    ckpt = Checkpoint("odds_2025", str(tmp_path))
+    ckpt.record("2025-06-01", _blob(90))
+    with open(ckpt.path, "a") as f:
+        f.write('{"key": "2025-06-08", "val')  # crash mid-write
+    again = Checkpoint("odds_2025", str(tmp_path))
+    assert "2025-06-01" in again and "2025-06-08" not in again
+
+
+def test_odds_resume_from_partial_checkpoint(tmp_path, monkeypatch):
+    monkeypatch.setattr(checkpoint, "CHECKPOINT_DIR", str(tmp_path))
+    with open("data/teams_2025.json") as f:
+        monkeypatch.setattr(table_rankings, "TEAMS", json.load(f))
+    # a previous run finished the first two weeks before it died
+    ckpt = Checkpoint("odds_2025")
+    ckpt.record("2025-06-01", _blob(90))
+    ckpt.record("2025-06-08", _blob(91))
+    fetched = []
+
+    def get_json(url, params=None, ttl=0):
+        fetched.append(url.split("dateEnd=")[1].split("&")[0])
+        return _blob(92)
+
+    monkeypatch.setattr(get_client("www.fangraphs.com"), "get_json", get_json)
+    df = table_rankings.sunday_odds(2025, sundays=SUNDAYS, workers=2)
+    assert sorted(fetched) == ["2025-06-15", "2025-06-22"]
+    assert df.sort_values("date")["expected_wins"].tolist() == [90, 91, 92, 92]
+    assert set(df["team_name"]) == {"toronto-bluejays"}
+    # complete: the checkpoint is gone, so the next season run starts fresh
+    assert not (tmp_path / "odds_2025.jsonl").exists()
@@ -0,0 +1,53 @@
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+import datasets
+import storage
+
+
+@pytest.mark.skipif(not storage.available(), reason="pyarrow not installed")
+def test_partition_without_csv_is_stale(tmp_path):
+    shutil.copyfile("data/odds_2025.csv", tmp_path / "odds_2025.csv")
+    assert datasets.load_dataset("odds", 2025, str(tmp_path)) is not None
+    part = storage.partition_path("odds", 2025, str(tmp_path))
+    assert os.path.isfile(part)
+    os.remove(tmp_path / "odds_2025.csv")
+    assert datasets.load_dataset("odds", 2025, str(tmp_path)) is None
+    assert not os.path.exists(part)
+
+
+def test_memory_report_labels_synthetic_seasons():
+    real = datasets.memory_report(2025).set_index("dataset")
+    assert real.loc["total", "seasons"] == 1 and real.loc["total", "synthetic"] == 0
+    est = datasets.memory_report(2025, synthetic=3).set_index("dataset")
+    assert est.loc["power", "seasons"] == 4 and est.loc["power", "synthetic"] == 3
+    assert est.loc["power", "rows"] == 4 * real.loc["power", "rows"]
+
+
+def test_synthetic_season_has_its_own_dates_and_urls():
+    df = datasets.load_dataset("power", 2025).astype({"url": str})
+    older = datasets._synthetic_season(df, 2)
+    assert older["date"].dt.year.unique().tolist() == [2023]
+    assert set(older["url"]).isdisjoint(df["url"])
+    assert older["team_id"].equals(df["team_id"])
+
+
+def test_odds_values_round_trip(tmp_path):
+    csv = pd.read_csv("data/odds_2025.csv")
+    odds = datasets.load_dataset("odds", 2025, columnar=False)
+    for col in csv.columns.drop(["date", "team_name"]):
+        assert odds[col].to_numpy().tolist() == csv[col].tolist()
+    datasets.write_dataset("odds", 2025, odds, str(tmp_path))
+    again = pd.read_csv(tmp_path / "odds_2025.csv")
+    pd.testing.assert_frame_equal(again, csv)
+
+
+@pytest.mark.skipif(not storage.available(), reason="pyarrow not installed")
+def test_partition_with_old_dtypes_is_rebuilt(tmp_path):
+    shutil.copyfile("data/odds_2025.csv", tmp_path / "odds_2025.csv")
+    old = datasets.load_dataset("odds", 2025, str(tmp_path)).astype({"ros_wins": "float32"})
+    storage.write_frame(old, storage.partition_path("odds", 2025, str(tmp_path)))
+    assert datasets.load_dataset("odds", 2025, str(tmp_path))["ros_wins"].dtype == "float64"
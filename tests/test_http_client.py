@@ -0,0 +1,83 @@
+import time
+
+import pytest
+
+from http_client import HttpClient, RetryableStatus, TokenBucket, call_with_retries
+
+
+def test_token_bucket_spacing():
+    bucket = TokenBucket(rate=50, burst=1)
+    start = time.monotonic()
+    for _ in range(6):
+        bucket.acquire()
+    # the first token is free, the other five wait 1/50 s each
+    assert time.monotonic() - start >= 5 / 50 * 0.9
+
+
+def test_token_bucket_burst_is_immediate():
+    bucket = TokenBucket(rate=1, burst=3)
+    start = time.monotonic()
+    for _ in range(3):
+        bucket.acquire()
+    assert time.monotonic() - start < 0.5
+
+
+class _Limiter:
+    def __init__(self):
+        self.acquired = 0
+
+    def acquire(self):
+        self.acquired += 1
+
+
+def test_call_with_retries_paces_every_attempt():
+    calls, limiter = [], _Limiter()
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise ConnectionError("reset")
+        return "ok"
+
+    assert call_with_retries(flaky, retries=3, backoff=0, limiter=limiter) == "ok"
+    assert len(calls) == 3 and limiter.acquired == 3
+
+
+def test_call_with_retries_gives_up():
+    calls = []
+
+    def down():
+        calls.append(1)
+        raise ConnectionError("down")
+
+    with pytest.raises(ConnectionError):
+        call_with_retries(down, retries=2, backoff=0)
+    assert len(calls) == 3
+
+
+class _Response:
+    def __init__(self, status_code, text=""):
+        self.status_code = status_code
+        self.text = text
+
+
+class _Session:
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+        self.calls = 0
+
+    def get(self, url, params=None, timeout=None):
+        self.calls += 1
+        return _Response(self.statuses.pop(0), "body")
+
+
+def test_client_retries_retryable_statuses():
+    client = HttpClient(rate=1000, burst=10, retries=3, backoff=0)
+    client._local.session = session = _Session([503, 429, 200])
+    assert client.get("https://example.com/").status_code == 200
+    assert session.calls == 3
+
+    client._local.session = session = _Session([503] * 4)
+    with pytest.raises(RetryableStatus):
+        client.get("https://example.com/")
+    assert session.calls == 4
@@ -0,0 +1,22 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY = ("scipy", "sklearn", "statsmodels", "hmmlearn", "selenium", "statsapi", "tqdm")
+IMPORT_SECONDS = 5.0  # ~0.4 s here; the heavy stack alone takes several seconds
+
+
+def test_app_import_stays_light():
+    code = ("import sys, time\n"
+            "t0 = time.perf_counter()\n"
+            "import app\n"
+            "print(time.perf_counter() - t0)\n"
+            f"print(','.join(m for m in {HEAVY!r} if m in sys.modules))\n")
+    env = {k: v for k, v in os.environ.items() if not k.startswith("MLB_")}
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env,
+                         capture_output=True, text=True, timeout=60, check=True).stdout.splitlines()
+    seconds, loaded = float(out[-2]), out[-1]
+    assert loaded == ""
+    assert seconds < IMPORT_SECONDS
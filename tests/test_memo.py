@@ -0,0 +1,11 @@
+import pandas as pd
+
+from memo import frame_fingerprint
+
+
+def test_fingerprint_follows_content():
+    df = pd.read_csv("data/odds_2025.csv")
+    assert frame_fingerprint(df) == frame_fingerprint(pd.read_csv("data/odds_2025.csv"))
+    changed = df.copy()
+    changed.loc[0, "ros_wins"] += 1
+    assert frame_fingerprint(changed) != frame_fingerprint(df)
@@ -0,0 +1,85 @@
+import json
+
+import pandas as pd
+
+import mlb_rankings
+import table_rankings
+from table_rankings import StandingsStandIn, sunday_standings
+
+
+def _stored_standings(tmp_path, drop):
+    full = pd.read_csv("data/standings_2025.csv")
+    kept = full[pd.to_datetime(full["date"]) != pd.Timestamp(drop)]
+    kept.to_csv(tmp_path / "standings_2025.csv", index=False)
+    return full
+
+
+def test_season_sundays_stop_at_today():
+    sundays = table_rankings.season_sundays(2025, today="2025-07-01")
+    assert sundays[0] == pd.Timestamp("2025-03-02")
+    assert sundays[-1] == pd.Timestamp("2025-06-29")
+
+
+def test_missing_sundays_include_gaps_before_later_rows(tmp_path):
+    _stored_standings(tmp_path, drop="2025-06-15")
+    # the file has rows up to 2025-09-28; the gap before them is still missing
+    missing = mlb_rankings.missing_sundays("standings", 2025, str(tmp_path), today="2025-07-01")
+    assert pd.Timestamp("2025-06-15") in missing
+    assert all(d <= pd.Timestamp("2025-07-01") for d in missing)
+
+
+def test_missing_sundays_skip_pre_and_postseason(tmp_path):
+    _stored_standings(tmp_path, drop="2025-06-15")
+    missing = mlb_rankings.missing_sundays("standings", 2025, str(tmp_path), today="2025-12-01")
+    # stored weeks run 2025-04-06..2025-09-28: March and October Sundays are not retried
+    assert pd.Timestamp("2025-06-15") in missing
+    assert min(missing) >= pd.Timestamp("2025-04-06")
+    assert max(missing) <= pd.Timestamp("2025-09-28")
+
+
+def test_power_weeks_follow_the_article_dates(tmp_path):
+    power = pd.read_csv("data/power_rankings_2025.csv")
+    # an article published on the Tuesday after the season's last Sunday still covers it
+    power["date"] = power["date"].replace("2025-09-28", "2025-09-30")
+    power.to_csv(tmp_path / "power_rankings_2025.csv", index=False)
+    assert mlb_rankings.missing_sundays("power", 2025, str(tmp_path), today="2025-12-01") == []
+    # in season, only the weeks after the last article are missing
+    missing = mlb_rankings.missing_sundays("power", 2025, str(tmp_path), today="2025-10-15")
+    assert missing == [pd.Timestamp("2025-10-05"), pd.Timestamp("2025-10-12")]
+
+
+def test_refresh_weekly_refetches_failed_week(tmp_path, monkeypatch):
+    full = _stored_standings(tmp_path, drop="2025-06-15")
+    with open("data/teams_2025.json") as f:
+        monkeypatch.setattr(table_rankings, "TEAMS", json.load(f))
+    stand_in = StandingsStandIn(full)
+    fetched = []
+
+    def fetch(year, sundays):
+        fetched.extend(sundays)
+        return sunday_standings(year, sundays=sundays, client=stand_in, workers=2, rate=0)
+
+    monkeypatch.setitem(mlb_rankings.WEEKLY_FETCHERS, "standings", fetch)
+    out = mlb_rankings.refresh_weekly("standings", 2025, str(tmp_path))
+    assert pd.Timestamp("2025-06-15") in fetched
+    assert pd.Timestamp("2025-06-08") not in fetched
+    week = out[pd.to_datetime(out["date"]) == pd.Timestamp("2025-06-15")]
+    assert len(week) == 30
+
+
+def test_current_season():
+    from datetime import datetime
+    from refresh import current_season
+    assert current_season(datetime(2026, 2, 10)) == 2025
+    assert current_season(datetime(2026, 3, 1)) == 2026
+
+
+def test_watcher_follows_its_own_season(tmp_path, app_module):
+    from refresh import DatasetWatcher
+    seen = []
+    watcher = DatasetWatcher(2025, seen.append, data_dir=str(tmp_path))
+    watcher.check()
+    app_module.STATE = app_module.DataState(year=2024)  # a ?year=2024 request
+    (tmp_path / "standings_2025.csv").write_text("date\n")
+    assert watcher.check()
+    assert seen == [2025]
@@ -0,0 +1,155 @@
+import pytest
+
+import power_rankings
+import response_cache
+
+ARTICLE = "https://www.mlb.com/news/power-rankings-for-week-of-june-8-2025"
+RENDERED = "<html><body><article><div class='markdown'><p><strong>1. Blue Jays</strong></p>" \
+           "<p><strong>2. Yankees</strong></p></div></article></body></html>"
+TEAMS = {"toronto-bluejays": "Toronto Blue Jays", "new-york-yankees": "New York Yankees"}
+
+
+class FakeDriver:
+    def __init__(self, html):
+        self.html = html
+        self.urls = []
+
+    def get(self, url):
+        self.urls.append(url)
+
+    @property
+    def page_source(self):
+        return self.html
+
+    def quit(self):
+        pass
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(response_cache, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(power_rankings, "_HTTP_WORKS", {"search": None, "article": None, "teams": None})
+    mode = response_cache.get_mode()
+    response_cache.set_mode("readwrite")
+    yield tmp_path
+    response_cache.set_mode(mode)
+
+
+def _no_browser():
+    raise AssertionError("browser started")
+
+
+def test_rendered_page_is_recorded_and_replayed(cache, monkeypatch):
+    # plain HTTP returns the JavaScript shell; the browser renders the rankings
+    response_cache.put("www.mlb.com", ARTICLE, "<html><body></body></html>")
+    driver = FakeDriver(RENDERED)
+    assert power_rankings.get_rankings_from_article(ARTICLE, TEAMS, driver) == \
+        [("1", "toronto-bluejays"), ("2", "new-york-yankees")]
+    assert driver.urls == [ARTICLE]
+
+    response_cache.set_mode("replay")
+    monkeypatch.setattr(power_rankings, "get_webdriver", _no_browser)
+    monkeypatch.setattr(power_rankings, "_HTTP_WORKS", {"search": None, "article": None, "teams": None})
+    assert power_rankings.get_rankings_from_article(ARTICLE, TEAMS) == \
+        [("1", "toronto-bluejays"), ("2", "new-york-yankees")]
+
+
+def test_replay_raises_instead_of_starting_a_browser(cache, monkeypatch):
+    response_cache.put("www.mlb.com", ARTICLE, "<html><body></body></html>")
+    response_cache.set_mode("replay")
+    monkeypatch.setattr(power_rankings, "get_webdriver", _no_browser)
+    with pytest.raises(response_cache.CacheMiss):
+        power_rankings.get_rankings_from_article(ARTICLE, TEAMS)
+
+
+def test_replay_never_goes_to_the_network(cache, monkeypatch):
+    import http_client
+
+    def no_network(*args):
+        raise AssertionError("network request in replay mode")
+
+    monkeypatch.setattr(http_client.HttpClient, "_get_once", no_network)
+    response_cache.put("www.mlb.com", ARTICLE, "<html>recorded</html>")
+    response_cache.set_mode("replay")
+    # ttl=0 skips the cache when recording, but replay still answers from it
+    assert power_rankings.fetch_html(ARTICLE) == "<html>recorded</html>"
+    with pytest.raises(response_cache.CacheMiss):
+        power_rankings.fetch_html(ARTICLE + "?other", ttl=0)
+
+
+def test_empty_parse_falls_back_per_page(cache, monkeypatch):
+    # HTTP worked for the previous article; this one came back as a JavaScript shell
+    monkeypatch.setitem(power_rankings._HTTP_WORKS, "article", (True, 0.0))
+    response_cache.put("www.mlb.com", ARTICLE, "<html><body></body></html>")
+    driver = FakeDriver(RENDERED)
+    assert power_rankings.get_rankings_from_article(ARTICLE, TEAMS, driver)
+    assert driver.urls == [ARTICLE]
+
+
+def test_rendered_empty_page_is_not_rendered_again(cache, monkeypatch):
+    url = power_rankings._search_url(40)
+    driver = FakeDriver("<html><body><p>No results</p></body></html>")
+    response_cache.put("www.mlb.com", url, "<html><body></body></html>")
+    assert power_rankings.get_search_hits(40, driver) == []
+    response_cache.set_mode("replay")
+    monkeypatch.setattr(power_rankings, "get_webdriver", _no_browser)
+    assert power_rankings.get_search_hits(40) == []
+    assert driver.urls == [url]
+
+
+def test_browser_budget_is_shared_by_every_caller(monkeypatch):
+    import threading
+    import time
+    from scrape_pool import ScrapePool
+
+    live, peak, lock = [0], [0], threading.Lock()
+
+    class Browser(FakeDriver):
+        def __init__(self):
+            super().__init__("<html></html>")
+            with lock:
+                live[0] += 1
+                peak[0] = max(peak[0], live[0])
+
+        def quit(self):
+            with lock:
+                live[0] -= 1
+
+    pool = power_rankings.BrowserPool(2, factory=Browser)
+    monkeypatch.setattr(power_rankings, "BROWSERS", pool)
+
+    def page(_item, driver):
+        # the worker's own page, then a fallback with no driver passed (like the bbref season page)
+        power_rankings._with_driver(driver, lambda d: time.sleep(0.01))
+        return power_rankings._with_driver(None, lambda d: d.page_source)
+
+    with ScrapePool(size=6) as scrape:
+        assert len(scrape.map(page, range(24), url_of=lambda i: "https://www.mlb.com")) == 24
+    assert peak[0] == 2
+    assert live[0] == 0 and pool.running == 0  # the pool quit its idle browsers on close
+
+
+def test_fixture_parsers():
+    import json
+    import pandas as pd
+    with open("data/teams_2025.json") as f:
+        teams = json.load(f)
+
+    pairs = power_rankings.parse_team_list(power_rankings.load_fixture("teams"))
+    assert dict(pairs) == teams
+
+    hits = power_rankings.parse_search_hits(power_rankings.load_fixture("search_page1"))
+    assert len(hits) == 6  # the hit without a <time> is skipped
+    articles = power_rankings._filter_search_hits(hits, "2025-08-01", "2025-10-31")
+    assert [date for _, date, _ in articles] == ["2025-09-28", "2025-09-21", "2025-09-14", "2025-09-07", "2025-08-24"]
+    assert articles[0][2] == "https://www.mlb.com/news/power-rankings-entering-2025-postseason"
+
+    texts = power_rankings.parse_article_strong_texts(power_rankings.load_fixture("article_2025-06-08"))
+    got = power_rankings.rankings_from_strong_texts(texts, teams)
+    stored = pd.read_csv("data/power_rankings_2025.csv").query("date == '2025-06-08'")
+    assert [(int(rank), team_id) for rank, team_id in got] == list(zip(stored["rank"], stored["team_id"]))
+
+
+def test_benchmark_parsers_covers_every_fixture():
+    assert {name: n for name, (n, _ms) in power_rankings.benchmark_parsers(repeat=1).items()} == \
+        {"article_2025-06-08": 31, "search_page1": 6, "teams": 30}
@@ -0,0 +1,39 @@
+import json
+
+import snapshot
+
+# what wwwroot/app.js requests on first load, after /power, /standings, ... and /teams:
+# the mode radios start on "both" (Team Rankings) or on their first option ("mlb"); the
+# Performance Tier box has no radios, so its rankings fall back to mode=both
+DASHBOARD_FIRST_LOAD = [
+    ("/ranks", [("teams", "TOR"), ("mode", "both")]),
+    ("/kdes", [("teams", "TOR"), ("source", "mlb")]),
+    ("/volatility", [("teams", "TOR"), ("source", "mlb")]),
+    ("/stability", [("team", "TOR"), ("source", "mlb")]),
+    ("/granger", [("team", "TOR")]),
+    ("/ranks", [("teams", "NYY"), ("teams", "TOR"), ("mode", "mlb")]),
+    ("/similarity", [("team_a", "NYY"), ("team_b", "TOR"), ("source", "mlb")]),
+    ("/clusters", []),
+    ("/hmm", [("team", "TOR")]),
+]
+
+
+def test_dashboard_first_load_is_in_the_snapshot():
+    with open("data/tms_2025.json") as f:
+        codes = json.load(f).values()
+    stored = {snapshot.request_key(path, params) for path, params in snapshot.snapshot_queries(codes)}
+    missing = [path for path, params in DASHBOARD_FIRST_LOAD if snapshot.request_key(path, params) not in stored]
+    assert missing == []
+
+
+def test_defaults_share_an_entry():
+    assert snapshot.request_key("/clusters", []) == snapshot.request_key("/clusters", [("k", "6")])
+    assert snapshot.request_key("/kdes", [("teams", "TOR")]) == \
+        snapshot.request_key("/kdes", [("source", "power"), ("teams", "TOR")])
+
+
+def test_bare_clusters_served_from_snapshot(client, app_module, monkeypatch):
+    client.get("/power")  # load the season
+    key = snapshot.request_key("/clusters", [("k", "6")])
+    monkeypatch.setattr(app_module, "_snapshot_for", lambda state: {key: '{"from": "snapshot"}'})
+    assert client.get("/clusters").get_json() == {"from": "snapshot"}
@@ -0,0 +1,39 @@
+import json
+
+import pandas as pd
+
+from team_resolver import TeamResolver
+
+
+def _old_match_team(name, teams):
+    # the linear scan power_rankings.match_team used before TeamResolver
+    for ch in "'.’“”\"`´–—-":
+        name = name.replace(ch, "")
+    name = name.strip()
+    if name == "As":
+        name = "Athletics"
+    if name == "Dbacks":
+        name = "Diamondbacks"
+    for team_id, team_name in teams.items():
+        team_name_clean = team_name
+        for ch in "'.’“”\"`´–—-":
+            team_name_clean = team_name_clean.replace(ch, "")
+        team_name_clean = team_name_clean.strip()
+        if name.lower() in team_name_clean.lower() or team_name_clean.lower() in name.lower():
+            return team_id
+    return None
+
+
+def test_resolver_matches_old_scan_on_stored_names():
+    with open("data/teams_2025.json") as f:
+        teams = json.load(f)
+    power = pd.read_csv("data/power_rankings_2025.csv")
+    names = set(teams.values()) | set(power["team"]) | set(teams)
+    # the short forms articles use, plus names that used to hit the fallbacks
+    for full in list(teams.values()):
+        words = full.split()
+        names |= {" ".join(words[i:j]) for i in range(len(words)) for j in range(i + 1, len(words) + 1)}
+    names |= {"A's", "D-backs", "Dbacks", "Jays", "Sox", "N.Y. Mets", "Nationals (3-1)", "Expos", ""}
+    resolver = TeamResolver(teams)
+    for name in sorted(names):
+        assert resolver.resolve(name) == _old_match_team(name, teams), name
@@ -1161,29 +1161,19 @@ async function getClusters(chart_div) {
 
 
 }
+async function getLastStandingsRow(teamFullName) {
+    // indexed single-row lookup instead of downloading the whole /standings season
+    const res = await fetch(`/team_last?dataset=standings&team=${encodeURIComponent(teamFullName)}`).then(res => res.json());
+    return res.row;
+}
+
 async function getLastRankForTeam(teamFullName) {
-    const teamCode = TMS[teamFullName]
-    const standings = await fetch(`/standings`).then(res => res.json());
-    // filer by tema id
-    const teamStandings = standings.standings.filter(item => item.team_name === teamFullName);
-    // get the entry with the highest date
-    const latestEntry = teamStandings.reduce((latest, entry) => {
-        const entryDate = new Date(entry.date);
-        return entryDate > new Date(latest.date) ? entry : latest;
-    }, teamStandings[0]);
+    const latestEntry = await getLastStandingsRow(teamFullName);
     return latestEntry ? latestEntry.mlb_rank : null;
 }
 
 async function getLastWinPctForTeam(teamFullName) {
-    const teamCode = TMS[teamFullName]
-    const standings = await fetch(`/standings`).then(res => res.json());
-    // filer by tema id
-    const teamStandings = standings.standings.filter(item => item.team_name === teamFullName);
-    // get the entry with the highest date
-    const latestEntry = teamStandings.reduce((latest, entry) => {
-        const entryDate = new Date(entry.date);
-        return entryDate > new Date(latest.date) ? entry : latest;
-    }, teamStandings[0]);
+    const latestEntry = await getLastStandingsRow(teamFullName);
     return latestEntry ? latestEntry.winning_pct : null;
 }
 